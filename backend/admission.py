@@ -0,0 +1,83 @@
+from fastapi import HTTPException
+import asyncio
+import contextlib
+import os
+
+
+class ConcurrencyLimiter:
+    """FastAPI dependency capping how many requests of one route class run at once.
+
+    Requests over the limit wait up to `max_wait_seconds` for a slot, with at most
+    `max_waiting` queued; beyond that they get 503 with Retry-After instead of
+    piling up on the Mongo connection pool.
+    """
+
+    def __init__(self, name: str, limit: int, max_waiting: int, max_wait_seconds: float, retry_after_seconds: int):
+        self.name = name
+        self.limit = limit
+        self.max_waiting = max_waiting
+        self.max_wait_seconds = max_wait_seconds
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    @property
+    def saturated(self) -> bool:
+        return self.in_flight >= self.limit and self.waiting >= self.max_waiting
+
+    def _reject(self):
+        raise HTTPException(
+            status_code=503,
+            detail=f"Server busy, too many concurrent {self.name} requests",
+            headers={"Retry-After": str(self.retry_after_seconds)}
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Hold a slot for the duration of the block, for routes that must do work first"""
+        if self._semaphore.locked():
+            if self.waiting >= self.max_waiting or self.max_wait_seconds <= 0:
+                self._reject()
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.max_wait_seconds)
+            except asyncio.TimeoutError:
+                self._reject()
+            finally:
+                self.waiting -= 1
+        else:
+            await self._semaphore.acquire()
+
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    async def __call__(self):
+        async with self.slot():
+            yield
+
+    def snapshot(self) -> dict:
+        return {"limit": self.limit, "in_flight": self.in_flight, "waiting": self.waiting}
+
+
+# Uploads, exports, archiving and data generation hold connections for seconds
+bulk_limiter = ConcurrencyLimiter(
+    "bulk",
+    limit=int(os.environ.get('BULK_CONCURRENCY', '4')),
+    max_waiting=int(os.environ.get('BULK_MAX_WAITING', '8')),
+    max_wait_seconds=float(os.environ.get('BULK_MAX_WAIT_SECONDS', '2')),
+    retry_after_seconds=30,
+)
+interactive_limiter = ConcurrencyLimiter(
+    "interactive",
+    limit=int(os.environ.get('INTERACTIVE_CONCURRENCY', '64')),
+    max_waiting=int(os.environ.get('INTERACTIVE_MAX_WAITING', '256')),
+    max_wait_seconds=float(os.environ.get('INTERACTIVE_MAX_WAIT_SECONDS', '5')),
+    retry_after_seconds=1,
+)
+
+limiters = [interactive_limiter, bulk_limiter]
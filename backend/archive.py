@@ -0,0 +1,83 @@
+from pymongo import ReplaceOne
+from typing import List
+from datetime import datetime, timezone, timedelta
+import asyncio
+import logging
+import os
+
+from database import db
+from export_snapshots import invalidate_snapshots
+
+
+logger = logging.getLogger(__name__)
+
+# Lead archiving
+CLOSED_LEAD_STATUSES = ["won", "lost"]
+LEAD_ARCHIVE_AFTER_DAYS = int(os.environ.get('LEAD_ARCHIVE_AFTER_DAYS', '180'))
+LEAD_ARCHIVE_INTERVAL_MINUTES = int(os.environ.get('LEAD_ARCHIVE_INTERVAL_MINUTES', '0'))  # 0 disables the background job
+LEAD_ARCHIVE_BATCH_SIZE = 1000
+
+
+def lead_collections(include_archived: bool = False):
+    """Collections to read leads from; the archive is only consulted when asked"""
+    if include_archived:
+        return [db.leads, db.leads_archive]
+    return [db.leads]
+
+async def find_leads(query: dict, include_archived: bool = False, limit: int = 1000) -> List[dict]:
+    leads = []
+    seen_ids = set()
+    for collection in lead_collections(include_archived):
+        remaining = limit - len(leads)
+        if remaining <= 0:
+            break
+        # An archiving run interrupted between insert and delete leaves a lead in both
+        # collections; the hot copy is read first and wins
+        for lead in await collection.find(query, {"_id": 0}).to_list(remaining):
+            if lead.get('id') not in seen_ids:
+                seen_ids.add(lead.get('id'))
+                leads.append(lead)
+    return leads
+
+async def archive_closed_leads(older_than_days: int = LEAD_ARCHIVE_AFTER_DAYS) -> int:
+    """Move won/lost leads untouched for `older_than_days` from db.leads to db.leads_archive"""
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).isoformat()
+    query = {"status": {"$in": CLOSED_LEAD_STATUSES}, "updated_at": {"$lt": cutoff}}
+    
+    archived_count = 0
+    while True:
+        batch = await db.leads.find(query, {"_id": 0}).limit(LEAD_ARCHIVE_BATCH_SIZE).to_list(LEAD_ARCHIVE_BATCH_SIZE)
+        if not batch:
+            break
+        
+        archived_at = datetime.now(timezone.utc).isoformat()
+        for lead in batch:
+            lead['archived_at'] = archived_at
+        
+        # Replace rather than insert: a copy left by an interrupted earlier run may be
+        # older than the hot row
+        await db.leads_archive.bulk_write(
+            [ReplaceOne({"id": lead['id']}, lead, upsert=True) for lead in batch],
+            ordered=False
+        )
+        
+        # Re-check the archive filter so a lead reopened or edited since the batch was
+        # read stays hot; its archive copy is dropped (readers prefer the hot row meanwhile)
+        ids = [lead['id'] for lead in batch]
+        result = await db.leads.delete_many({"id": {"$in": ids}, **query})
+        if result.deleted_count < len(batch):
+            still_hot = await db.leads.distinct("id", {"id": {"$in": ids}})
+            await db.leads_archive.delete_many({"id": {"$in": still_hot}})
+        archived_count += result.deleted_count
+        await invalidate_snapshots(batch)
+    
+    return archived_count
+
+async def run_lead_archiver():
+    while True:
+        await asyncio.sleep(LEAD_ARCHIVE_INTERVAL_MINUTES * 60)
+        try:
+            archived_count = await archive_closed_leads()
+            logger.info(f"Archived {archived_count} closed leads")
+        except Exception:
+            logger.exception("Lead archiving failed")
@@ -0,0 +1,314 @@
+"""End-to-end API benchmark for the lead management backend.
+
+Runs the FastAPI app in-process (httpx ASGI transport) against a local mongod,
+or mongomock-motor with --backend mongomock. For each dataset size it loads
+synthetic users, districts and leads, then sends a role-scoped mix of traffic
+(admin, manager, sales) from concurrent workers. Throughput and p50/p95/p99
+latency per endpoint are written as JSON.
+
+    python benchmarks/api_benchmark.py --sizes 10000,100000 --output bench.json
+    python benchmarks/api_benchmark.py --sizes 10000 --baseline bench.json
+
+Per-endpoint throughput_rps is that endpoint's share of the whole run (its
+request count over the run's elapsed time). The seeded plan fixes the counts,
+so it moves only with total throughput and is reported for reading, not gated.
+
+With --baseline, each size/endpoint pair present in both reports is compared,
+and the script exits with status 1 if:
+- p95 latency regressed by more than --tolerance (only for endpoints with at
+  least --min-samples requests in both runs; below that p95 is close to the max)
+- the error count or error rate (responses >= 400) went above the baseline's
+- total throughput regressed by more than --tolerance
+
+The benchmark database (--db-name) is dropped before each dataset is loaded.
+Never point it at a database you care about.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+STATUSES = ["new", "contacted", "qualified", "proposal", "negotiation", "won", "lost"]
+
+USER_COUNT = 20
+DISTRICT_COUNT = 20
+
+# (endpoint name, role, weight); weights approximate production traffic
+TRAFFIC_MIX = [
+    ("get_leads", "admin", 10),
+    ("get_leads", "manager", 15),
+    ("get_leads", "sales", 30),
+    ("get_lead", "sales", 20),
+    ("get_lead", "manager", 5),
+    ("create_lead", "sales", 5),
+    ("get_dashboard_stats", "admin", 3),
+    ("get_dashboard_stats", "manager", 4),
+    ("get_dashboard_stats", "sales", 4),
+    ("get_region_rollups", "manager", 2),
+    ("export_leads", "manager", 1),
+    ("upload_leads", "admin", 1),
+]
+
+UPLOAD_ROWS = 200
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the lead management API in-process")
+    parser.add_argument("--sizes", default="10000,100000,1000000",
+                        help="comma-separated lead counts to benchmark")
+    parser.add_argument("--backend", choices=["mongod", "mongomock"], default="mongod")
+    parser.add_argument("--mongo-url", default=os.environ.get("BENCH_MONGO_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--db-name", default="lead_benchmark")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per dataset size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing (default 0.2 = 20%%)")
+    parser.add_argument("--min-samples", type=int, default=100,
+                        help="fewest requests an endpoint needs for its p95 to be compared")
+    return parser.parse_args()
+
+
+def import_app(args):
+    # database.py reads its configuration at import time
+    os.environ["MONGO_URL"] = args.mongo_url
+    os.environ["DB_NAME"] = args.db_name
+    # Startup hooks run once per dataset; keep background jobs off and snapshots out of the tree
+    os.environ["EXPORT_SNAPSHOT_INTERVAL_SECONDS"] = "0"
+    snapshot_dir = None
+    if "EXPORT_SNAPSHOT_DIR" not in os.environ:
+        snapshot_dir = tempfile.mkdtemp(prefix="lead_benchmark_exports_")
+        os.environ["EXPORT_SNAPSHOT_DIR"] = snapshot_dir
+    sys.path.insert(0, str(BACKEND_DIR))
+
+    if args.backend == "mongomock":
+        try:
+            from mongomock_motor import AsyncMongoMockClient
+        except ImportError:
+            sys.exit("--backend mongomock requires: pip install mongomock-motor")
+        import motor.motor_asyncio
+        motor.motor_asyncio.AsyncIOMotorClient = lambda *a, **kw: AsyncMongoMockClient()
+
+    import server
+    return server, snapshot_dir
+
+
+# ==================== DATASET ====================
+
+async def load_dataset(server, lead_count: int, seed: int) -> dict:
+    from data_generator import generate_dataset
+    from security import get_password_hash
+
+    await server.client.drop_database(server.db.name)
+    generated = await generate_dataset(
+        server.db, get_password_hash,
+        users=USER_COUNT, districts=DISTRICT_COUNT, leads=lead_count, seed=seed
+    )
+
+    users = {"admin": [], "manager": [], "sales": []}
+    for user in generated["users"]:
+        users[user["role"]].append(user)
+
+    # A sample of each rep's own leads for get_lead traffic
+    lead_ids = {}
+    for user in users["sales"]:
+        leads = await server.db.leads.find({"assigned_to": user["id"]}, {"_id": 0, "id": 1}).to_list(200)
+        lead_ids[user["id"]] = [lead["id"] for lead in leads]
+
+    return {"users": users, "lead_ids": lead_ids, "districts": generated["districts"]}
+
+
+# ==================== TRAFFIC ====================
+
+def build_request(endpoint: str, role: str, dataset: dict, tokens: dict, rng: random.Random):
+    """Return (method, url, kwargs) for one request of the given endpoint/role"""
+    user = rng.choice(dataset["users"][role])
+    headers = {"Authorization": f"Bearer {tokens[user['id']]}"}
+
+    if endpoint == "get_leads":
+        params = {"limit": 50, "skip": rng.choice([0, 0, 50, 100])}
+        if role != "sales" and rng.random() < 0.5:
+            params["district_id"] = rng.choice(dataset["districts"])["id"]
+        if rng.random() < 0.3:
+            params["status"] = rng.choice(STATUSES)
+        return "GET", "/api/leads", {"headers": headers, "params": params}
+    if endpoint == "get_lead":
+        owner = user["id"] if role == "sales" else rng.choice(list(dataset["lead_ids"]))
+        lead_id = rng.choice(dataset["lead_ids"][owner] or ["missing"])
+        return "GET", f"/api/leads/{lead_id}", {"headers": headers}
+    if endpoint == "create_lead":
+        body = {"name": "Bench Lead", "phone": f"+91{rng.randrange(10**9, 10**10)}",
+                "assigned_to": user["id"], "district_id": user.get("district_id")}
+        return "POST", "/api/leads", {"headers": headers, "json": body}
+    if endpoint == "get_dashboard_stats":
+        return "GET", "/api/dashboard/stats", {"headers": headers}
+    if endpoint == "get_region_rollups":
+        return "GET", "/api/dashboard/regions", {"headers": headers}
+    if endpoint == "export_leads":
+        params = {"district_id": rng.choice(dataset["districts"])["id"]}
+        return "GET", "/api/leads/export/excel", {"headers": headers, "params": params}
+    if endpoint == "upload_leads":
+        rows = "\n".join(f"Upload {i},+91{rng.randrange(10**9, 10**10)}" for i in range(UPLOAD_ROWS))
+        files = {"file": ("bench.csv", f"name,phone\n{rows}\n".encode(), "text/csv")}
+        return "POST", "/api/leads/upload", {"headers": headers, "files": files}
+    raise ValueError(f"Unknown endpoint {endpoint}")
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # Nearest-rank percentile
+    index = max(0, math.ceil(pct / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, status_code in samples if status_code >= 400)
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round(len(samples) / elapsed, 2) if elapsed > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run_traffic(server, dataset: dict, args) -> dict:
+    import httpx
+    from security import create_access_token
+
+    rng = random.Random(args.seed)
+    tokens = {
+        u["id"]: create_access_token(data={"sub": u["id"]})
+        for role_users in dataset["users"].values() for u in role_users
+    }
+    mix = [(endpoint, role) for endpoint, role, _ in TRAFFIC_MIX]
+    weights = [weight for _, _, weight in TRAFFIC_MIX]
+    plan = rng.choices(mix, weights, k=args.requests)
+    requests = [(endpoint, build_request(endpoint, role, dataset, tokens, rng)) for endpoint, role in plan]
+
+    samples = {}
+    queue = iter(requests)
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=None) as http:
+        async def worker():
+            for endpoint, (method, url, kwargs) in queue:
+                started = time.perf_counter()
+                response = await http.request(method, url, **kwargs)
+                await response.aread()
+                samples.setdefault(endpoint, []).append((time.perf_counter() - started, response.status_code))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    endpoints = {endpoint: summarize(endpoint_samples, elapsed) for endpoint, endpoint_samples in sorted(samples.items())}
+    return {
+        "elapsed_seconds": round(elapsed, 3),
+        "endpoints": endpoints,
+        "total": summarize([s for endpoint_samples in samples.values() for s in endpoint_samples], elapsed),
+    }
+
+
+# ==================== BASELINE ====================
+
+def error_rate(stats: dict) -> float:
+    # Reports written before error_rate was recorded only have the count
+    return stats.get("error_rate", stats["errors"] / stats["count"] if stats["count"] else 0.0)
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_samples: int = 100) -> list:
+    regressions = []
+    for size, result in report["results"].items():
+        baseline_result = baseline.get("results", {}).get(size)
+        if not baseline_result:
+            continue
+        endpoints = [(endpoint, stats, baseline_result["endpoints"].get(endpoint))
+                     for endpoint, stats in result["endpoints"].items()]
+        for endpoint, stats, before in endpoints + [("total", result["total"], baseline_result["total"])]:
+            if not before:
+                continue
+            # Fast 4xx/5xx responses would otherwise pass as a latency improvement
+            if stats["errors"] > before["errors"] or error_rate(stats) > error_rate(before):
+                regressions.append(
+                    f"{size} {endpoint}: errors {before['errors']}/{before['count']} -> {stats['errors']}/{stats['count']}"
+                )
+            # With few samples the nearest-rank p95 is effectively the slowest request
+            enough_samples = min(stats["count"], before["count"]) >= min_samples
+            if enough_samples and before["p95_ms"] > 0 and stats["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{size} {endpoint}: p95 {before['p95_ms']}ms -> {stats['p95_ms']}ms")
+        # Per-endpoint throughput only mirrors the total, so gate on the total
+        before, after = baseline_result["total"]["throughput_rps"], result["total"]["throughput_rps"]
+        if after < before * (1 - tolerance):
+            regressions.append(f"{size} total: throughput {before} -> {after} req/s")
+    return regressions
+
+
+async def main():
+    args = parse_args()
+    server, snapshot_dir = import_app(args)
+
+    report = {
+        "meta": {
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "seed": args.seed,
+            "python": platform.python_version(),
+            "started_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {},
+    }
+    try:
+        for size in (int(s) for s in args.sizes.split(",")):
+            started = time.perf_counter()
+            dataset = await load_dataset(server, size, args.seed)
+            # Create the app's indexes on the fresh database
+            for handler in server.app.router.on_startup:
+                await handler()
+            load_seconds = time.perf_counter() - started
+            print(f"Loaded {size} leads in {load_seconds:.1f}s", file=sys.stderr)
+
+            result = await run_traffic(server, dataset, args)
+            result["load_seconds"] = round(load_seconds, 2)
+            report["results"][str(size)] = result
+            print(f"{size}: {result['total']}", file=sys.stderr)
+    finally:
+        await server.client.drop_database(args.db_name)
+        for handler in server.app.router.on_shutdown:
+            await handler()
+        if snapshot_dir:
+            shutil.rmtree(snapshot_dir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+    if args.baseline:
+        regressions = compare(report, json.loads(Path(args.baseline).read_text()), args.tolerance, args.min_samples)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""Cold-start benchmark: import time and peak RSS of a fresh worker.
+
+Imports server.py in --runs fresh interpreters, the way each uvicorn worker
+does. Reports the median import time and peak RSS as JSON.
+
+    python benchmarks/cold_start.py --output cold_start.json
+    python benchmarks/cold_start.py --baseline cold_start.json
+
+Exits with status 1 if any of these happen:
+- a heavy dependency that should load on first use (pandas, openpyxl,
+  numpy) is imported at startup
+- a --max-* budget is exceeded
+- a metric regresses past --baseline by more than --tolerance
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+LAZY_MODULES = ["pandas", "openpyxl", "numpy"]
+
+CHILD = f"""
+import json, resource, sys, time
+started = time.perf_counter()
+import server
+elapsed = time.perf_counter() - started
+max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+max_rss_mb = max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+print(json.dumps({{
+    "import_seconds": elapsed,
+    "max_rss_mb": max_rss_mb,
+    "eager_modules": [m for m in {LAZY_MODULES!r} if m in sys.modules],
+}}))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measure worker cold-start import time and memory")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed relative regression before failing (default 0.2 = 20%%)")
+    parser.add_argument("--max-import-seconds", type=float)
+    parser.add_argument("--max-rss-mb", type=float)
+    return parser.parse_args()
+
+
+def measure_once() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    samples = [measure_once() for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "python": sys.version.split()[0],
+        "import_seconds": round(statistics.median(s["import_seconds"] for s in samples), 4),
+        "max_rss_mb": round(statistics.median(s["max_rss_mb"] for s in samples), 1),
+        "eager_modules": sorted({m for s in samples for m in s["eager_modules"]}),
+    }
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(output)
+    else:
+        print(output)
+
+    failures = []
+    if report["eager_modules"]:
+        failures.append(f"imported at startup: {', '.join(report['eager_modules'])}")
+    if args.max_import_seconds and report["import_seconds"] > args.max_import_seconds:
+        failures.append(f"import took {report['import_seconds']}s (budget {args.max_import_seconds}s)")
+    if args.max_rss_mb and report["max_rss_mb"] > args.max_rss_mb:
+        failures.append(f"peak RSS {report['max_rss_mb']}MB (budget {args.max_rss_mb}MB)")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        for metric in ("import_seconds", "max_rss_mb"):
+            if report[metric] > baseline[metric] * (1 + args.tolerance):
+                failures.append(f"{metric} {baseline[metric]} -> {report[metric]}")
+
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""Deterministic synthetic data for development, load tests and benchmarks.
+
+Generates users, districts and leads with skewed status/source mixes, a
+long-tailed spread of leads across districts, leads assigned to sales reps
+in their own district, and timestamps spread over the past `days`. The
+same seed (and `as_of`) always yields the same documents.
+
+    python data_generator.py --users 50 --districts 40 --leads 1000000 --seed 7 --drop
+    python data_generator.py --leads 100000 --seed 7 --as-of 2024-01-01 --drop
+
+Timestamps are relative to --as-of (default: now), so pass it too when two
+runs must produce identical data.
+
+The CLI writes to the database configured in backend/.env.
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+
+# The first users are always the demo accounts /api/seed-data hands out
+DEMO_USERS = [
+    {"email": "admin@leadmanagement.com", "full_name": "Admin User", "role": "admin",
+     "phone": "+1234567890", "password": "admin123"},
+    {"email": "manager@leadmanagement.com", "full_name": "Manager User", "role": "manager",
+     "phone": "+1234567891", "password": "manager123"},
+    {"email": "sales@leadmanagement.com", "full_name": "Sales Rep", "role": "sales",
+     "phone": "+1234567892", "password": "sales123"},
+]
+GENERATED_USER_PASSWORD = "password123"
+MANAGER_EVERY = 10  # one generated manager per ten generated users
+
+REGIONS = {
+    "North": ["Delhi", "Punjab", "Haryana", "Uttar Pradesh"],
+    "South": ["Karnataka", "Tamil Nadu", "Kerala", "Telangana"],
+    "East": ["West Bengal", "Odisha", "Bihar"],
+    "West": ["Maharashtra", "Gujarat", "Rajasthan"],
+}
+
+STATUSES = ["new", "contacted", "qualified", "proposal", "negotiation", "won", "lost"]
+# Recent leads are mostly early in the funnel, older ones have mostly closed
+RECENT_STATUS_WEIGHTS = [35, 25, 15, 10, 7, 4, 4]
+AGED_STATUS_WEIGHTS = [5, 8, 7, 5, 5, 35, 35]
+AGED_AFTER_DAYS = 90
+
+SOURCES = ["website", "referral", "manual", "advertisement", "upload"]
+SOURCE_WEIGHTS = [45, 20, 15, 12, 8]
+
+COMPANY_SUFFIXES = ["Solar", "Industries", "Traders", "Enterprises", "Infra", "Textiles", "Foods"]
+
+BATCH_SIZE = 10000
+MAX_INFLIGHT_BATCHES = 4
+
+
+def deterministic_id(rng: random.Random) -> str:
+    # Same layout as uuid.uuid4(), but reproducible from the seed
+    value = rng.getrandbits(128)
+    value = (value & ~(0xf000 << 64)) | (0x4000 << 64)  # version 4
+    value = (value & ~(0xc000 << 48)) | (0x8000 << 48)  # RFC 4122 variant
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def build_districts(rng: random.Random, count: int, as_of: datetime) -> list:
+    states = [(region, state) for region, region_states in REGIONS.items() for state in region_states]
+    districts = []
+    for i in range(count):
+        region, state = states[i % len(states)]
+        districts.append({
+            "id": deterministic_id(rng),
+            "name": f"{state} District {i // len(states) + 1}",
+            "code": f"D{i + 1:03d}",
+            "state": state,
+            "region": region,
+            "created_at": as_of.isoformat(),
+        })
+    return districts
+
+
+def build_users(rng: random.Random, count: int, districts: list, as_of: datetime,
+                hash_password: Callable[[str], str]) -> list:
+    # bcrypt is deliberately slow, so hash each distinct password exactly once
+    hashes = {password: hash_password(password)
+              for password in {u["password"] for u in DEMO_USERS} | {GENERATED_USER_PASSWORD}}
+
+    users = []
+    for i in range(count):
+        if i < len(DEMO_USERS):
+            profile = dict(DEMO_USERS[i])
+        else:
+            role = "manager" if i % MANAGER_EVERY == 0 else "sales"
+            profile = {"email": f"{role}{i}@leadmanagement.com", "full_name": f"{role.title()} {i}",
+                       "role": role, "phone": f"+91{rng.randrange(10**9, 10**10)}",
+                       "password": GENERATED_USER_PASSWORD}
+        district_id = None
+        if profile["role"] != "admin" and districts:
+            district_id = districts[i % len(districts)]["id"]
+        users.append({
+            "id": deterministic_id(rng),
+            "email": profile["email"],
+            "full_name": profile["full_name"],
+            "role": profile["role"],
+            "phone": profile["phone"],
+            "district_id": district_id,
+            "is_active": True,
+            "hashed_password": hashes[profile.pop("password")],
+            "created_at": as_of.isoformat(),
+            "updated_at": as_of.isoformat(),
+        })
+    return users
+
+
+def build_lead_batches(rng: random.Random, count: int, districts: list, users: list,
+                       as_of: datetime, days: int, batch_size: int = BATCH_SIZE):
+    """Yield lists of lead documents, `batch_size` at a time"""
+    district_ids = [d["id"] for d in districts] or [None]
+    # Long tail: a few metro districts hold most of the pipeline
+    district_weights = [1 / (rank + 1) ** 0.8 for rank in range(len(district_ids))]
+
+    sales_ids = [u["id"] for u in users if u["role"] == "sales"]
+    sales_by_district = {}
+    for user in users:
+        if user["role"] == "sales":
+            sales_by_district.setdefault(user["district_id"], []).append(user["id"])
+    creator_id = users[0]["id"] if users else None
+
+    # Sampled once; drawing from this pool is much cheaper than a lognormal per lead
+    budgets = [float(round(rng.lognormvariate(11.5, 0.8), -3)) for _ in range(1000)]
+
+    span_minutes = days * 24 * 60
+    aged_minutes = AGED_AFTER_DAYS * 24 * 60
+    random_float = rng.random
+
+    generated = 0
+    while generated < count:
+        size = min(batch_size, count - generated)
+        # Draw categorical fields for the whole batch at once
+        batch_districts = rng.choices(district_ids, district_weights, k=size)
+        batch_sources = rng.choices(SOURCES, SOURCE_WEIGHTS, k=size)
+        recent_statuses = rng.choices(STATUSES, RECENT_STATUS_WEIGHTS, k=size)
+        aged_statuses = rng.choices(STATUSES, AGED_STATUS_WEIGHTS, k=size)
+        batch_budgets = rng.choices(budgets, k=size)
+
+        batch = []
+        for i in range(size):
+            n = generated + i
+            district_id = batch_districts[i]
+            age_minutes = int(random_float() * span_minutes)
+            created_at = as_of - timedelta(minutes=age_minutes)
+            updated_at = created_at + timedelta(minutes=int(random_float() * min(age_minutes, 30 * 24 * 60)))
+            lead_status = aged_statuses[i] if age_minutes > aged_minutes else recent_statuses[i]
+
+            candidates = sales_by_district.get(district_id) or sales_ids
+            assigned_to = None
+            if candidates and random_float() < 0.9:
+                assigned_to = candidates[int(random_float() * len(candidates))]
+
+            expected_close_date = None
+            if lead_status in ("proposal", "negotiation"):
+                expected_close_date = (updated_at + timedelta(days=15 + int(random_float() * 75))).isoformat()
+
+            batch.append({
+                "id": deterministic_id(rng),
+                "name": f"Lead {n}",
+                "email": f"lead{n}@example.com" if random_float() < 0.7 else None,
+                "phone": f"+91{7000000000 + int(random_float() * 2999999999)}",
+                "company": f"Company {n % 5000} {COMPANY_SUFFIXES[n % len(COMPANY_SUFFIXES)]}" if random_float() < 0.6 else None,
+                "status": lead_status,
+                "source": batch_sources[i],
+                "district_id": district_id,
+                "assigned_to": assigned_to,
+                "notes": None,
+                "budget": batch_budgets[i],
+                "expected_close_date": expected_close_date,
+                "created_at": created_at.isoformat(),
+                "updated_at": updated_at.isoformat(),
+                "created_by": creator_id,
+            })
+        generated += size
+        yield batch
+
+
+async def generate_dataset(
+    db,
+    hash_password: Callable[[str], str],
+    users: int = 3,
+    districts: int = 4,
+    leads: int = 8,
+    seed: int = 42,
+    days: int = 730,
+    as_of: Optional[datetime] = None,
+) -> dict:
+    """Insert a synthetic dataset into `db` and return the users and districts created"""
+    rng = random.Random(seed)
+    as_of = as_of or datetime.now(timezone.utc)
+
+    district_docs = build_districts(rng, districts, as_of)
+    user_docs = build_users(rng, max(users, 1), district_docs, as_of, hash_password)
+    if district_docs:
+        await db.districts.insert_many([dict(d) for d in district_docs])
+    await db.users.insert_many([dict(u) for u in user_docs])
+
+    # Keep a few batches in flight so generation overlaps with the inserts
+    inflight = set()
+    for batch in build_lead_batches(rng, leads, district_docs, user_docs, as_of, days):
+        if len(inflight) >= MAX_INFLIGHT_BATCHES:
+            done, inflight = await asyncio.wait(inflight, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                task.result()
+        inflight.add(asyncio.ensure_future(db.leads.insert_many(batch, ordered=False)))
+    if inflight:
+        await asyncio.gather(*inflight)
+
+    # These inserts bypass the API, so mark the export snapshots they touch as stale
+    from export_snapshots import invalidate_snapshots
+    await invalidate_snapshots(
+        {"district_id": district_id, "status": lead_status}
+        for district_id in [None] + [d["id"] for d in district_docs]
+        for lead_status in STATUSES
+    )
+
+    for user in user_docs:
+        user.pop("hashed_password")
+    return {"users": user_docs, "districts": district_docs, "leads": leads}
+
+
+def parse_as_of(value: str) -> datetime:
+    as_of = datetime.fromisoformat(value)
+    # Naive values are taken as UTC, like the rest of the stored timestamps
+    return as_of if as_of.tzinfo else as_of.replace(tzinfo=timezone.utc)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Generate synthetic lead management data")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--districts", type=int, default=40)
+    parser.add_argument("--leads", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--days", type=int, default=730, help="spread lead timestamps over this many days")
+    parser.add_argument("--as-of", type=parse_as_of,
+                        help="ISO date or datetime the timestamps lead up to (default: now, UTC)")
+    parser.add_argument("--drop", action="store_true",
+                        help="drop existing users, districts and leads first")
+    return parser.parse_args()
+
+
+async def main():
+    args = parse_args()
+
+    # Imported here so importing this module does not connect to MongoDB
+    from database import db
+    from security import get_password_hash
+
+    if args.drop:
+        for collection in ("users", "districts", "leads", "leads_archive"):
+            await db[collection].drop()
+    elif await db.users.count_documents({}, limit=1):
+        raise SystemExit("Database already has users; rerun with --drop to replace them")
+
+    started = time.perf_counter()
+    await generate_dataset(
+        db, get_password_hash,
+        users=args.users, districts=args.districts, leads=args.leads,
+        seed=args.seed, days=args.days, as_of=args.as_of,
+    )
+    elapsed = time.perf_counter() - started
+    print(f"Generated {args.users} users, {args.districts} districts and {args.leads} leads "
+          f"in {elapsed:.1f}s ({args.leads / elapsed:,.0f} leads/s)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+import os
+import threading
+from pathlib import Path
+
+from metrics import MongoCommandListener
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+# Connection pool and timeouts
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', '0'))
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', '5000'))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get('MONGO_CONNECT_TIMEOUT_MS', '5000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get('MONGO_SOCKET_TIMEOUT_MS', '60000'))  # long enough for exports
+# snappy and zstd also work if python-snappy / zstandard are installed; empty disables
+MONGO_COMPRESSORS = os.environ.get('MONGO_COMPRESSORS', 'zlib')
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks connection checkouts so /health/ready can report pool utilization"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+
+    def _add(self, field: str, delta: int):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + delta)
+
+    def connection_check_out_started(self, event):
+        self._add("waiting", 1)
+
+    def connection_check_out_failed(self, event):
+        self._add("waiting", -1)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.waiting -= 1
+            self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self._add("checked_out", -1)
+
+    def connection_created(self, event):
+        self._add("open_connections", 1)
+
+    def connection_closed(self, event):
+        self._add("open_connections", -1)
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+
+pool_monitor = PoolMonitor()
+
+# MongoDB connection
+mongo_url = os.environ['MONGO_URL']
+client_options = dict(
+    maxPoolSize=MONGO_MAX_POOL_SIZE,
+    minPoolSize=MONGO_MIN_POOL_SIZE,
+    waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    event_listeners=[MongoCommandListener(), pool_monitor],
+)
+if MONGO_COMPRESSORS:
+    client_options["compressors"] = MONGO_COMPRESSORS
+client = AsyncIOMotorClient(mongo_url, **client_options)
+db = client[os.environ['DB_NAME']]
@@ -0,0 +1,346 @@
+"""Pre-generated lead export workbooks, one per district x status scope.
+
+Every scope has a version token in db.export_snapshot_scopes, replaced whenever a
+lead in that scope is written. A snapshot on local disk records the token it was
+built from, so it can be served as-is while the token is unchanged - across all
+workers on the host - and is rebuilt in the background once it changes. Random
+tokens rather than counters keep old snapshots stale even if the collection is
+dropped and versions start over.
+"""
+from fastapi import Request
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from pymongo import UpdateOne
+from typing import Iterable, Optional
+from datetime import datetime, timezone
+from pathlib import Path
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import time
+import uuid
+
+from database import ROOT_DIR, db
+
+
+logger = logging.getLogger(__name__)
+
+EXPORT_ROW_LIMIT = 1000
+EXPORT_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+EXPORT_HEADERS = ['Name', 'Email', 'Phone', 'Company', 'Status', 'Source', 'District', 'Assigned To', 'Budget', 'Created At']
+
+EXPORT_SNAPSHOT_DIR = Path(os.environ.get('EXPORT_SNAPSHOT_DIR', ROOT_DIR / 'export_snapshots'))
+EXPORT_SNAPSHOT_INTERVAL_SECONDS = int(os.environ.get('EXPORT_SNAPSHOT_INTERVAL_SECONDS', '300'))  # 0 disables pre-generation
+# Superseded files stay around briefly so in-flight downloads from other workers finish
+EXPORT_SNAPSHOT_RETAIN_SECONDS = 3600
+# Builds started by export misses run outside the bulk limiter, so cap them per worker;
+# skipped scopes are picked up by the background builder
+MAX_SCHEDULED_SNAPSHOT_BUILDS = 2
+READ_CHUNK_SIZE = 64 * 1024
+
+LEAD_STATUSES = ["new", "contacted", "qualified", "proposal", "negotiation", "won", "lost"]
+ALL = "*"
+
+RANGE_PATTERN = re.compile(r"bytes=(\d*)-(\d*)")
+
+# Scopes this worker is currently building, so concurrent misses build once
+building_scopes = set()
+build_tasks = set()
+
+
+# ==================== WORKBOOK ====================
+
+def render_leads_workbook(leads: list) -> bytes:
+    from openpyxl import Workbook
+    from openpyxl.styles import Font, Alignment
+
+    # Create Excel workbook
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Leads"
+
+    # Headers
+    ws.append(EXPORT_HEADERS)
+
+    # Style headers
+    for cell in ws[1]:
+        cell.font = Font(bold=True)
+        cell.alignment = Alignment(horizontal='center')
+
+    # Add data
+    for lead in leads:
+        ws.append([
+            lead.get('name', ''),
+            lead.get('email', ''),
+            lead.get('phone', ''),
+            lead.get('company', ''),
+            lead.get('status', ''),
+            lead.get('source', ''),
+            lead.get('district_id', ''),
+            lead.get('assigned_to', ''),
+            lead.get('budget', ''),
+            lead.get('created_at', '')
+        ])
+
+    # Save to bytes
+    excel_file = io.BytesIO()
+    wb.save(excel_file)
+    return excel_file.getvalue()
+
+
+# ==================== SCOPES ====================
+
+def snapshot_scope(district_id: Optional[str], status: Optional[str]) -> str:
+    return f"{district_id or ALL}|{status or ALL}"
+
+async def is_snapshot_scope(district_id: Optional[str], status: Optional[str]) -> bool:
+    """Whether exports with these filters are served from snapshots (one of all_scopes())"""
+    if status and status not in LEAD_STATUSES:
+        return False
+    if district_id and not await db.districts.find_one({"id": district_id}, {"_id": 1}):
+        return False
+    return True
+
+def scope_query(scope: str) -> dict:
+    district_id, status = scope.split("|", 1)
+    query = {}
+    if district_id != ALL:
+        query["district_id"] = district_id
+    if status != ALL:
+        query["status"] = status
+    return query
+
+def lead_scopes(lead: dict) -> set:
+    """Every export scope whose contents include this lead"""
+    districts = {ALL} | ({lead["district_id"]} if lead.get("district_id") else set())
+    statuses = {ALL} | ({lead["status"]} if lead.get("status") else set())
+    return {f"{district_id}|{status}" for district_id in districts for status in statuses}
+
+async def invalidate_snapshots(leads: Iterable[dict]):
+    """Give every scope touched by `leads` a new version (pass old and new states on updates)"""
+    scopes = set()
+    for lead in leads:
+        scopes |= lead_scopes(lead)
+    if not scopes:
+        return
+    version = uuid.uuid4().hex
+    await db.export_snapshot_scopes.bulk_write(
+        [UpdateOne({"_id": scope}, {"$set": {"version": version}}, upsert=True) for scope in sorted(scopes)],
+        ordered=False
+    )
+
+async def scope_version(scope: str) -> Optional[str]:
+    doc = await db.export_snapshot_scopes.find_one({"_id": scope})
+    return doc["version"] if doc else None
+
+
+# ==================== SNAPSHOT FILES ====================
+
+def scope_slug(scope: str) -> str:
+    return hashlib.sha1(scope.encode()).hexdigest()[:16]
+
+def manifest_path(scope: str) -> Path:
+    return EXPORT_SNAPSHOT_DIR / f"{scope_slug(scope)}.json"
+
+def read_manifest(scope: str) -> Optional[dict]:
+    try:
+        return json.loads(manifest_path(scope).read_text())
+    except (FileNotFoundError, ValueError):
+        return None
+
+def write_atomic(path: Path, content: bytes):
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+async def build_snapshot(scope: str) -> dict:
+    # Read the version first: a write landing during the build leaves the snapshot stale, not wrong
+    version = await scope_version(scope)
+    leads = await db.leads.find(scope_query(scope), {"_id": 0}).to_list(EXPORT_ROW_LIMIT)
+
+    # Hash the rows, not the workbook: openpyxl stamps save times into the file, so
+    # identical rows would otherwise get a new file and ETag on every build
+    sha256 = hashlib.sha256(json.dumps([EXPORT_HEADERS, leads], sort_keys=True, default=str).encode()).hexdigest()
+    file_name = f"{scope_slug(scope)}-{sha256[:16]}.xlsx"
+    path = EXPORT_SNAPSHOT_DIR / file_name
+    EXPORT_SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+    if path.exists():
+        # Reused; refresh its age so pruning does not take it
+        os.utime(path)
+    else:
+        write_atomic(path, await asyncio.to_thread(render_leads_workbook, leads))
+
+    manifest = {
+        "scope": scope,
+        "version": version,
+        "sha256": sha256,
+        "file": file_name,
+        "size": path.stat().st_size,
+        "rows": len(leads),
+        "built_at": datetime.now(timezone.utc).isoformat()
+    }
+    write_atomic(manifest_path(scope), json.dumps(manifest).encode())
+    return manifest
+
+async def fresh_snapshot(scope: str) -> Optional[dict]:
+    """The snapshot for `scope` if it reflects the current data, else None"""
+    manifest = read_manifest(scope)
+    if manifest is None or not (EXPORT_SNAPSHOT_DIR / manifest["file"]).exists():
+        return None
+    if manifest["version"] != await scope_version(scope):
+        return None
+    return manifest
+
+def schedule_snapshot_build(scope: str):
+    if scope in building_scopes or len(build_tasks) >= MAX_SCHEDULED_SNAPSHOT_BUILDS:
+        return
+    building_scopes.add(scope)
+
+    async def build():
+        try:
+            await build_snapshot(scope)
+            # Also prune here: the background builder (and its pruning) may be disabled
+            prune_snapshot_files(set(await all_scopes()))
+        except Exception:
+            logger.exception(f"Building export snapshot {scope} failed")
+        finally:
+            building_scopes.discard(scope)
+
+    task = asyncio.create_task(build())
+    build_tasks.add(task)
+    task.add_done_callback(build_tasks.discard)
+
+
+# ==================== SERVING ====================
+
+def parse_range(match: re.Match, size: int) -> Optional[tuple]:
+    """(start, end) inclusive for a single `bytes=` range, or None if unsatisfiable"""
+    first, last = match.groups()
+    if first == "" and last == "":
+        return None
+    if first == "":
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return None
+    return start, end
+
+def iter_file_range(path: Path, start: int, end: int):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(READ_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+def snapshot_response(request: Request, manifest: dict) -> Response:
+    path = EXPORT_SNAPSHOT_DIR / manifest["file"]
+    size = manifest["size"]
+    etag = f'"{manifest["sha256"]}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": "attachment; filename=leads_export.xlsx"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    # Multi-range and other forms are ignored, which RFC 9110 allows; the full file is sent
+    range_match = RANGE_PATTERN.fullmatch(request.headers.get("range", "").strip())
+    if_range = request.headers.get("if-range")
+    if range_match and (if_range is None or if_range == etag):
+        byte_range = parse_range(range_match, size)
+        if byte_range is None:
+            return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{size}"})
+        start, end = byte_range
+        return StreamingResponse(
+            iter_file_range(path, start, end),
+            status_code=206,
+            media_type=EXPORT_MEDIA_TYPE,
+            headers={
+                **headers,
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1)
+            }
+        )
+
+    return FileResponse(path, media_type=EXPORT_MEDIA_TYPE, headers=headers)
+
+
+# ==================== BACKGROUND BUILDER ====================
+
+async def all_scopes() -> list:
+    district_ids = [d["id"] for d in await db.districts.find({}, {"_id": 0, "id": 1}).to_list(None)]
+    return [
+        snapshot_scope(district_id, status)
+        for district_id in [None] + district_ids
+        for status in [None] + LEAD_STATUSES
+    ]
+
+async def refresh_stale_snapshots() -> int:
+    versions = {doc["_id"]: doc["version"] async for doc in db.export_snapshot_scopes.find({})}
+
+    scopes = await all_scopes()
+    rebuilt = 0
+    for scope in scopes:
+        manifest = read_manifest(scope)
+        if manifest and manifest["version"] == versions.get(scope):
+            continue
+        if scope in building_scopes:
+            continue
+        building_scopes.add(scope)
+        try:
+            await build_snapshot(scope)
+            rebuilt += 1
+        finally:
+            building_scopes.discard(scope)
+
+    prune_snapshot_files(set(scopes))
+    return rebuilt
+
+def prune_snapshot_files(scopes: set):
+    """Delete manifests of scopes no longer in `scopes` (e.g. deleted districts), then
+    workbooks no manifest points at, once they are old enough"""
+    if not EXPORT_SNAPSHOT_DIR.exists():
+        return
+    referenced = set()
+    for path in EXPORT_SNAPSHOT_DIR.glob("*.json"):
+        try:
+            manifest = json.loads(path.read_text())
+            if manifest["scope"] not in scopes:
+                path.unlink()
+                continue
+            referenced.add(manifest["file"])
+        except (FileNotFoundError, ValueError, KeyError):
+            continue
+    cutoff = time.time() - EXPORT_SNAPSHOT_RETAIN_SECONDS
+    for path in EXPORT_SNAPSHOT_DIR.glob("*.xlsx"):
+        try:
+            if path.name not in referenced and path.stat().st_mtime < cutoff:
+                path.unlink()
+        except FileNotFoundError:
+            continue
+
+async def run_snapshot_builder():
+    while True:
+        try:
+            rebuilt = await refresh_stale_snapshots()
+            if rebuilt:
+                logger.info(f"Rebuilt {rebuilt} export snapshots")
+        except Exception:
+            logger.exception("Export snapshot refresh failed")
+        await asyncio.sleep(EXPORT_SNAPSHOT_INTERVAL_SECONDS)
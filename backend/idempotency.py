@@ -0,0 +1,110 @@
+from fastapi import HTTPException
+from pymongo.errors import DuplicateKeyError, OperationFailure
+from typing import Optional
+from datetime import datetime, timezone, timedelta
+import asyncio
+import os
+
+from database import db
+
+
+# Idempotency keys
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.environ.get('IDEMPOTENCY_KEY_TTL_SECONDS', '86400'))
+IDEMPOTENCY_WAIT_SECONDS = 120  # how long a duplicate waits for the in-flight original
+# A claim not completed or released within this long is presumed dead (worker killed
+# mid-request) and can be taken over by a retry; keep it above the slowest upload
+IDEMPOTENCY_LEASE_SECONDS = int(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '600'))
+IDEMPOTENCY_POLL_INTERVAL_SECONDS = 0.25
+
+
+async def ensure_idempotency_ttl_index():
+    """Create the TTL index on created_at, or update its expiry if the setting changed"""
+    try:
+        await db.idempotency_keys.create_index("created_at", expireAfterSeconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+    except OperationFailure as e:
+        # IndexOptionsConflict: the index exists with the previous TTL
+        if e.code != 85:
+            raise
+        await db.command(
+            "collMod", "idempotency_keys",
+            index={"keyPattern": {"created_at": 1}, "expireAfterSeconds": IDEMPOTENCY_KEY_TTL_SECONDS}
+        )
+
+def idempotency_record_id(idempotency_key: Optional[str], route: str, user_id: str) -> Optional[str]:
+    if not idempotency_key:
+        return None
+    # Keys are scoped per user and route so clients cannot replay each other's responses
+    return f"{user_id}:{route}:{idempotency_key}"
+
+async def begin_idempotent_request(
+    record_id: Optional[str],
+    fingerprint: str,
+    wait_seconds: float = IDEMPOTENCY_WAIT_SECONDS
+) -> Optional[dict]:
+    """Claim an idempotency key (returns None), or return the completed record of the request
+    that already used it: its stored "response" and the "replay" data passed on completion"""
+    if record_id is None:
+        return None
+    
+    now = datetime.now(timezone.utc)
+    try:
+        # created_at stays a BSON date (not an ISO string) so the TTL index can expire it
+        await db.idempotency_keys.insert_one({
+            "_id": record_id,
+            "fingerprint": fingerprint,
+            "state": "in_progress",
+            "locked_until": now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS),
+            "created_at": now
+        })
+        return None
+    except DuplicateKeyError:
+        pass
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + wait_seconds
+    while True:
+        record = await db.idempotency_keys.find_one({"_id": record_id})
+        if record is None:
+            # The original request failed and released the key
+            return await begin_idempotent_request(record_id, fingerprint, max(deadline - loop.time(), 0))
+        if record["fingerprint"] != fingerprint:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if record["state"] == "completed":
+            return record
+        if await take_over_expired_claim(record_id):
+            return None
+        if loop.time() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": str(max(int(wait_seconds), 1))}
+            )
+        await asyncio.sleep(IDEMPOTENCY_POLL_INTERVAL_SECONDS)
+
+async def take_over_expired_claim(record_id: str) -> bool:
+    """Claim an in-progress key whose lease ran out; only one waiter can win"""
+    now = datetime.now(timezone.utc)
+    result = await db.idempotency_keys.update_one(
+        {"_id": record_id, "state": "in_progress", "$or": [
+            {"locked_until": {"$lt": now}},
+            # Claims made before leases were recorded
+            {"locked_until": {"$exists": False}, "created_at": {"$lt": now - timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS)}}
+        ]},
+        {"$set": {"locked_until": now + timedelta(seconds=IDEMPOTENCY_LEASE_SECONDS), "created_at": now}}
+    )
+    return result.modified_count == 1
+
+async def complete_idempotent_request(record_id: Optional[str], response: dict, replay: Optional[dict] = None):
+    """Store the response; `replay` holds whatever side effects a replay must redo"""
+    if record_id is None:
+        return
+    await db.idempotency_keys.update_one(
+        {"_id": record_id},
+        {"$set": {"state": "completed", "response": response, "replay": replay or {}}}
+    )
+
+async def release_idempotency_key(record_id: Optional[str]):
+    """Forget a failed request so a retry with the same key is processed again"""
+    if record_id is None:
+        return
+    await db.idempotency_keys.delete_one({"_id": record_id, "state": "in_progress"})
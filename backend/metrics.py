@@ -0,0 +1,204 @@
+"""Prometheus metrics for HTTP routes, MongoDB commands and bulk lead jobs"""
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Match
+import contextvars
+import json
+import logging
+import os
+import time
+
+
+logger = logging.getLogger(__name__)
+
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_SECONDS', '1.0'))
+SLOW_REQUEST_MAX_QUERIES = 10
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route (time to headers for streamed responses)",
+    ["method", "route"], buckets=LATENCY_BUCKETS
+)
+REQUEST_COUNT = Counter(
+    "http_requests_total", "HTTP responses by route and status code",
+    ["method", "route", "status"]
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being handled",
+    ["method", "route"], multiprocess_mode="livesum"
+)
+MONGO_COMMAND_LATENCY = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by collection and command",
+    ["collection", "command"], buckets=LATENCY_BUCKETS
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "Failed MongoDB commands by collection and command",
+    ["collection", "command"]
+)
+PASSWORD_HASH_SECONDS = Counter(
+    "password_hash_seconds_total", "Time spent in bcrypt hashing and verification",
+    ["operation"]
+)
+LEAD_ROWS = Counter(
+    "lead_rows_total", "Rows processed by lead upload and export",
+    ["operation"]
+)
+LEAD_ROWS_PER_SECOND = Gauge(
+    "lead_rows_per_second", "Throughput of the most recent lead upload or export",
+    ["operation"], multiprocess_mode="mostrecent"
+)
+
+# Mongo commands issued while handling the current request, for the slow-request log.
+# Motor runs pymongo calls in an executor with a copy of the caller's context, so the
+# listener below sees (and appends to) the list the middleware installed.
+current_request_commands = contextvars.ContextVar("current_request_commands", default=None)
+
+# Commands whose filter describes what was scanned
+SHAPE_FIELDS = {
+    "find": "filter",
+    "count": "query",
+    "distinct": "query",
+    "aggregate": "pipeline",
+    "findAndModify": "query",
+}
+
+
+def query_shape(value):
+    """Replace literal values with '?' so queries group by structure, not data"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if any(isinstance(item, (dict, list)) for item in value):
+            return [query_shape(item) for item in value]
+        return ["?"] if value else []
+    return "?"
+
+
+def command_shape(command_name: str, command: dict):
+    if command_name in SHAPE_FIELDS:
+        return query_shape(command.get(SHAPE_FIELDS[command_name], {}))
+    if command_name in ("update", "delete"):
+        statements = command.get(command_name + "s") or [{}]
+        return query_shape(statements[0].get("q", {}))
+    return None
+
+
+def command_collection(command_name: str, command: dict) -> str:
+    collection = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    return collection if isinstance(collection, str) else "none"
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending = {}
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = (
+            command_collection(event.command_name, event.command),
+            command_shape(event.command_name, event.command),
+            current_request_commands.get(),
+        )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        collection = self._finish(event)
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+    def _finish(self, event) -> str:
+        collection, shape, request_commands = self._pending.pop(
+            (event.connection_id, event.request_id), ("none", None, None)
+        )
+        seconds = event.duration_micros / 1_000_000
+        MONGO_COMMAND_LATENCY.labels(collection, event.command_name).observe(seconds)
+        if request_commands is not None:
+            request_commands.append((collection, event.command_name, shape, seconds))
+        return collection
+
+
+def record_password_hash(operation: str, started: float):
+    PASSWORD_HASH_SECONDS.labels(operation).inc(time.perf_counter() - started)
+
+
+def record_lead_rows(operation: str, rows: int, started: float):
+    elapsed = time.perf_counter() - started
+    LEAD_ROWS.labels(operation).inc(rows)
+    if elapsed > 0:
+        LEAD_ROWS_PER_SECOND.labels(operation).set(rows / elapsed)
+
+
+def route_template(request: Request) -> str:
+    # Label by route template (/api/leads/{lead_id}) to keep label cardinality bounded
+    for route in request.app.router.routes:
+        match, _ = route.matches(request.scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+def log_slow_request(method: str, route: str, elapsed: float, status_code: int, commands: list):
+    # Collapse repeated shapes so N+1 loops show up as one line with a count
+    totals = {}
+    for collection, command_name, shape, seconds in commands:
+        key = (collection, command_name, json.dumps(shape, sort_keys=True, default=str))
+        count, total_seconds = totals.get(key, (0, 0.0))
+        totals[key] = (count + 1, total_seconds + seconds)
+
+    slowest = sorted(totals.items(), key=lambda item: item[1][1], reverse=True)[:SLOW_REQUEST_MAX_QUERIES]
+    queries = "; ".join(
+        f"{collection}.{command_name} x{count} {total_seconds * 1000:.0f}ms shape={shape}"
+        for (collection, command_name, shape), (count, total_seconds) in slowest
+    )
+    logger.warning(
+        f"Slow request {method} {route} -> {status_code} took {elapsed * 1000:.0f}ms "
+        f"with {len(commands)} Mongo commands: {queries or 'none'}"
+    )
+
+
+async def metrics_middleware(request: Request, call_next):
+    # call_next returns once the response headers are ready, so for streamed bodies
+    # (exports, snapshot downloads) the latency recorded is time to headers, not the
+    # full transfer
+    method = request.method
+    route = route_template(request)
+    commands = []
+    token = current_request_commands.set(commands)
+
+    in_flight = REQUESTS_IN_FLIGHT.labels(method, route)
+    in_flight.inc()
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        elapsed = time.perf_counter() - started
+        in_flight.dec()
+        current_request_commands.reset(token)
+        REQUEST_LATENCY.labels(method, route).observe(elapsed)
+        REQUEST_COUNT.labels(method, route, str(status_code)).inc()
+        if elapsed >= SLOW_REQUEST_SECONDS:
+            log_slow_request(method, route, elapsed, status_code, commands)
+
+
+def metrics_response() -> Response:
+    registry = REGISTRY
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        # Aggregate across uvicorn workers
+        from prometheus_client import multiprocess
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
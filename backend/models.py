@@ -0,0 +1,133 @@
+from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from typing import List, Optional
+import uuid
+from datetime import datetime, timezone
+
+
+# User Models
+class UserBase(BaseModel):
+    email: EmailStr
+    full_name: str
+    role: str = "sales"  # admin, manager, sales
+    phone: Optional[str] = None
+    district_id: Optional[str] = None
+    is_active: bool = True
+
+class UserCreate(UserBase):
+    password: str
+
+class UserUpdate(BaseModel):
+    full_name: Optional[str] = None
+    phone: Optional[str] = None
+    role: Optional[str] = None
+    district_id: Optional[str] = None
+    is_active: Optional[bool] = None
+    password: Optional[str] = None
+
+class User(UserBase):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+class UserLogin(BaseModel):
+    email: EmailStr
+    password: str
+
+class Token(BaseModel):
+    access_token: str
+    token_type: str
+    user: User
+
+
+# Lead Models
+class LeadBase(BaseModel):
+    name: str
+    email: Optional[EmailStr] = None
+    phone: str
+    company: Optional[str] = None
+    status: str = "new"  # new, contacted, qualified, proposal, negotiation, won, lost
+    source: str = "manual"  # manual, website, referral, advertisement, upload
+    district_id: Optional[str] = None
+    assigned_to: Optional[str] = None
+    notes: Optional[str] = None
+    budget: Optional[float] = None
+    expected_close_date: Optional[datetime] = None
+
+class LeadCreate(LeadBase):
+    pass
+
+class LeadUpdate(BaseModel):
+    name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone: Optional[str] = None
+    company: Optional[str] = None
+    status: Optional[str] = None
+    source: Optional[str] = None
+    district_id: Optional[str] = None
+    assigned_to: Optional[str] = None
+    notes: Optional[str] = None
+    budget: Optional[float] = None
+    expected_close_date: Optional[datetime] = None
+
+class Lead(LeadBase):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_by: Optional[str] = None
+
+class LeadStatusUpdate(BaseModel):
+    status: str
+    notes: Optional[str] = None
+
+
+# District Models
+class DistrictBase(BaseModel):
+    name: str
+    code: str
+    state: Optional[str] = None
+    region: Optional[str] = None
+
+class DistrictCreate(DistrictBase):
+    pass
+
+class District(DistrictBase):
+    model_config = ConfigDict(extra="ignore")
+    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+# Dashboard Models
+class DashboardStats(BaseModel):
+    total_leads: int
+    new_leads: int
+    contacted_leads: int
+    qualified_leads: int
+    won_leads: int
+    lost_leads: int
+    conversion_rate: float
+    total_revenue: float
+    leads_by_status: dict
+    leads_by_district: dict
+    leads_by_source: dict
+    recent_activities: List[dict]
+
+class RollupCounts(BaseModel):
+    total_leads: int = 0
+    won_leads: int = 0
+    total_revenue: float = 0
+    conversion_rate: float = 0
+
+class DistrictRollup(RollupCounts):
+    district_id: Optional[str] = None
+    name: str
+    code: Optional[str] = None
+
+class StateRollup(RollupCounts):
+    name: str
+    districts: List[DistrictRollup] = []
+
+class RegionRollup(RollupCounts):
+    name: str
+    states: List[StateRollup] = []
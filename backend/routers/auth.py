@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException, Depends, status
+from datetime import datetime
+
+from database import db
+from models import User, UserLogin, Token
+from security import verify_password, create_access_token, get_current_active_user
+
+
+router = APIRouter()
+
+
+@router.post("/auth/login", response_model=Token)
+async def login(user_login: UserLogin):
+    user = await db.users.find_one({"email": user_login.email}, {"_id": 0})
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    if not verify_password(user_login.password, user["hashed_password"]):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Incorrect email or password"
+        )
+    
+    # Convert timestamps
+    if isinstance(user.get('created_at'), str):
+        user['created_at'] = datetime.fromisoformat(user['created_at'])
+    if isinstance(user.get('updated_at'), str):
+        user['updated_at'] = datetime.fromisoformat(user['updated_at'])
+    
+    access_token = create_access_token(data={"sub": user["id"]})
+    
+    # Remove hashed_password before returning
+    user.pop("hashed_password", None)
+    
+    return {
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": User(**user)
+    }
+
+@router.get("/auth/me", response_model=User)
+async def get_me(current_user: User = Depends(get_current_active_user)):
+    return current_user
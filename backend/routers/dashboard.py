@@ -0,0 +1,158 @@
+from fastapi import APIRouter, Depends
+from typing import List
+
+from archive import find_leads, lead_collections
+from models import User, DashboardStats, RollupCounts, DistrictRollup, StateRollup, RegionRollup
+from routers.districts import get_district_hierarchy
+from security import get_current_active_user
+
+
+router = APIRouter()
+
+
+@router.get("/dashboard/stats", response_model=DashboardStats)
+async def get_dashboard_stats(
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    query = {}
+    
+    # Sales reps only see their own stats
+    if current_user.role == "sales":
+        query["assigned_to"] = current_user.id
+    
+    # Get all leads
+    all_leads = await find_leads(query, include_archived, 10000)
+    
+    # Calculate statistics
+    total_leads = len(all_leads)
+    
+    # Count by status
+    status_counts = {}
+    for lead in all_leads:
+        status = lead.get('status', 'new')
+        status_counts[status] = status_counts.get(status, 0) + 1
+    
+    # Count by district
+    district_counts = {}
+    for lead in all_leads:
+        district = lead.get('district_id', 'unassigned')
+        district_counts[district] = district_counts.get(district, 0) + 1
+    
+    # Count by source
+    source_counts = {}
+    for lead in all_leads:
+        source = lead.get('source', 'manual')
+        source_counts[source] = source_counts.get(source, 0) + 1
+    
+    # Calculate revenue
+    total_revenue = sum(lead.get('budget', 0) or 0 for lead in all_leads if lead.get('status') == 'won')
+    
+    # Calculate conversion rate
+    won_leads = status_counts.get('won', 0)
+    conversion_rate = (won_leads / total_leads * 100) if total_leads > 0 else 0
+    
+    # Get recent activities (last 10 updated leads)
+    recent_leads = sorted(all_leads, key=lambda x: x.get('updated_at', ''), reverse=True)[:10]
+    recent_activities = [
+        {
+            "lead_id": lead.get('id'),
+            "lead_name": lead.get('name'),
+            "status": lead.get('status'),
+            "updated_at": lead.get('updated_at')
+        }
+        for lead in recent_leads
+    ]
+    
+    return DashboardStats(
+        total_leads=total_leads,
+        new_leads=status_counts.get('new', 0),
+        contacted_leads=status_counts.get('contacted', 0),
+        qualified_leads=status_counts.get('qualified', 0),
+        won_leads=status_counts.get('won', 0),
+        lost_leads=status_counts.get('lost', 0),
+        conversion_rate=round(conversion_rate, 2),
+        total_revenue=total_revenue,
+        leads_by_status=status_counts,
+        leads_by_district=district_counts,
+        leads_by_source=source_counts,
+        recent_activities=recent_activities
+    )
+
+
+def add_rollup_counts(target: RollupCounts, counts: dict):
+    target.total_leads += counts['total_leads']
+    target.won_leads += counts['won_leads']
+    target.total_revenue += counts['total_revenue']
+    target.conversion_rate = round(target.won_leads / target.total_leads * 100, 2) if target.total_leads > 0 else 0
+
+@router.get("/dashboard/regions", response_model=List[RegionRollup])
+async def get_region_rollups(
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    query = {}
+    
+    # Sales reps only see their own stats
+    if current_user.role == "sales":
+        query["assigned_to"] = current_user.id
+    
+    pipeline = [
+        {"$match": query},
+        {"$group": {
+            "_id": "$district_id",
+            "total_leads": {"$sum": 1},
+            "won_leads": {"$sum": {"$cond": [{"$eq": ["$status", "won"]}, 1, 0]}},
+            "total_revenue": {"$sum": {"$cond": [{"$eq": ["$status", "won"]}, {"$ifNull": ["$budget", 0]}, 0]}},
+        }},
+    ]
+    
+    # Archived copies of leads still in db.leads (an archiving run interrupted between
+    # insert and delete) are skipped so nothing is counted twice
+    archive_pipeline = [
+        {"$match": query},
+        {"$lookup": {"from": "leads", "localField": "id", "foreignField": "id", "as": "hot"}},
+        {"$match": {"hot": {"$size": 0}}},
+        pipeline[1],
+    ]
+    
+    # One grouped aggregation per collection, merged by district
+    district_counts = {}
+    for collection in lead_collections(include_archived):
+        collection_pipeline = archive_pipeline if collection.name == "leads_archive" else pipeline
+        async for row in collection.aggregate(collection_pipeline):
+            counts = district_counts.setdefault(row['_id'], {"total_leads": 0, "won_leads": 0, "total_revenue": 0})
+            counts['total_leads'] += row['total_leads']
+            counts['won_leads'] += row['won_leads']
+            counts['total_revenue'] += row['total_revenue'] or 0
+    
+    hierarchy = await get_district_hierarchy()
+    
+    regions = {}
+    for district_id, counts in district_counts.items():
+        district = hierarchy.get(district_id) or {}
+        region_name = district.get('region') or "Unassigned"
+        state_name = district.get('state') or "Unassigned"
+        
+        region = regions.setdefault(region_name, RegionRollup(name=region_name))
+        state = next((s for s in region.states if s.name == state_name), None)
+        if state is None:
+            state = StateRollup(name=state_name)
+            region.states.append(state)
+        district_rollup = DistrictRollup(
+            district_id=district_id,
+            name=district.get('name') or "Unassigned",
+            code=district.get('code')
+        )
+        state.districts.append(district_rollup)
+        
+        for node in (region, state, district_rollup):
+            add_rollup_counts(node, counts)
+    
+    # Busiest branches first at every level
+    for region in regions.values():
+        region.states.sort(key=lambda s: s.total_leads, reverse=True)
+        for state in region.states:
+            state.districts.sort(key=lambda d: d.total_leads, reverse=True)
+    
+    return sorted(regions.values(), key=lambda r: r.total_leads, reverse=True)
@@ -0,0 +1,85 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+from datetime import datetime, timezone, timedelta
+
+from database import db
+from models import User, District, DistrictCreate
+from security import get_current_active_user
+
+
+router = APIRouter()
+
+# district id -> {id, name, code, state, region}; refreshed on district writes in this
+# worker and after DISTRICT_CACHE_TTL_SECONDS to pick up writes made by other workers
+DISTRICT_CACHE_TTL_SECONDS = 300
+district_hierarchy_cache: Optional[dict] = None
+district_hierarchy_loaded_at: Optional[datetime] = None
+
+async def get_district_hierarchy(refresh: bool = False) -> dict:
+    global district_hierarchy_cache, district_hierarchy_loaded_at
+    
+    now = datetime.now(timezone.utc)
+    expired = (
+        district_hierarchy_loaded_at is None
+        or now - district_hierarchy_loaded_at > timedelta(seconds=DISTRICT_CACHE_TTL_SECONDS)
+    )
+    if refresh or district_hierarchy_cache is None or expired:
+        districts = await db.districts.find(
+            {}, {"_id": 0, "id": 1, "name": 1, "code": 1, "state": 1, "region": 1}
+        ).to_list(None)
+        district_hierarchy_cache = {district['id']: district for district in districts}
+        district_hierarchy_loaded_at = now
+    
+    return district_hierarchy_cache
+
+@router.post("/districts", response_model=District)
+async def create_district(district_create: DistrictCreate, current_user: User = Depends(get_current_active_user)):
+    # Only admin can create districts
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    district_obj = District(**district_create.model_dump())
+    doc = district_obj.model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    
+    await db.districts.insert_one(doc)
+    await get_district_hierarchy(refresh=True)
+    return district_obj
+
+@router.get("/districts", response_model=List[District])
+async def get_districts(current_user: User = Depends(get_current_active_user)):
+    districts = await db.districts.find({}, {"_id": 0}).to_list(1000)
+    
+    # Convert timestamps
+    for district in districts:
+        if isinstance(district.get('created_at'), str):
+            district['created_at'] = datetime.fromisoformat(district['created_at'])
+    
+    return districts
+
+@router.get("/districts/{district_id}", response_model=District)
+async def get_district(district_id: str, current_user: User = Depends(get_current_active_user)):
+    district = await db.districts.find_one({"id": district_id}, {"_id": 0})
+    if not district:
+        raise HTTPException(status_code=404, detail="District not found")
+    
+    # Convert timestamps
+    if isinstance(district.get('created_at'), str):
+        district['created_at'] = datetime.fromisoformat(district['created_at'])
+    
+    return District(**district)
+
+@router.delete("/districts/{district_id}")
+async def delete_district(district_id: str, current_user: User = Depends(get_current_active_user)):
+    # Only admin can delete districts
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    result = await db.districts.delete_one({"id": district_id})
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="District not found")
+    
+    await get_district_hierarchy(refresh=True)
+    
+    return {"message": "District deleted successfully"}
@@ -0,0 +1,50 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+import asyncio
+import os
+import time
+
+from admission import interactive_limiter, limiters
+from database import MONGO_MAX_POOL_SIZE, client, pool_monitor
+
+
+# Report not-ready once this share of the Mongo pool is checked out with requests queued
+READY_MAX_POOL_UTILIZATION = float(os.environ.get('READY_MAX_POOL_UTILIZATION', '0.9'))
+READY_PING_TIMEOUT_SECONDS = 1.0
+
+router = APIRouter()
+
+
+@router.get("/health/live")
+async def liveness():
+    return {"status": "ok"}
+
+
+@router.get("/health/ready")
+async def readiness():
+    """Lets the load balancer route around workers whose pool or queues are saturated"""
+    mongo_ok = True
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(client.admin.command("ping"), READY_PING_TIMEOUT_SECONDS)
+    except Exception:
+        mongo_ok = False
+    ping_ms = round((time.perf_counter() - started) * 1000, 2)
+    
+    utilization = pool_monitor.checked_out / MONGO_MAX_POOL_SIZE if MONGO_MAX_POOL_SIZE else 0
+    pool_saturated = utilization >= READY_MAX_POOL_UTILIZATION and pool_monitor.waiting > 0
+    
+    ready = mongo_ok and not pool_saturated and not interactive_limiter.saturated
+    body = {
+        "status": "ready" if ready else "not_ready",
+        "mongo": {"ok": mongo_ok, "ping_ms": ping_ms},
+        "pool": {
+            "max_size": MONGO_MAX_POOL_SIZE,
+            "open": pool_monitor.open_connections,
+            "checked_out": pool_monitor.checked_out,
+            "waiting": pool_monitor.waiting,
+            "utilization": round(utilization, 3),
+        },
+        "limiters": {limiter.name: limiter.snapshot() for limiter in limiters},
+    }
+    return JSONResponse(body, status_code=200 if ready else 503)
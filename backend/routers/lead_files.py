@@ -0,0 +1,212 @@
+from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, Header, Request
+from fastapi.responses import StreamingResponse
+from pymongo.errors import BulkWriteError
+from typing import Optional
+import hashlib
+import io
+import time
+
+from admission import bulk_limiter
+from archive import LEAD_ARCHIVE_AFTER_DAYS, archive_closed_leads, find_leads
+from database import db
+from export_snapshots import (
+    EXPORT_MEDIA_TYPE,
+    EXPORT_ROW_LIMIT,
+    fresh_snapshot,
+    invalidate_snapshots,
+    is_snapshot_scope,
+    render_leads_workbook,
+    schedule_snapshot_build,
+    snapshot_response,
+    snapshot_scope,
+)
+from idempotency import (
+    begin_idempotent_request,
+    complete_idempotent_request,
+    idempotency_record_id,
+    release_idempotency_key,
+)
+from metrics import record_lead_rows
+from models import User, Lead
+from security import get_current_active_user
+
+# Bulk lead operations (import, export, archiving), each behind the bulk
+# concurrency limiter. pandas and openpyxl are imported only where they are used
+# (parse_lead_rows and export_snapshots.render_leads_workbook); together they add
+# most of a worker's import time and tens of MB of RSS.
+
+
+router = APIRouter()
+
+
+@router.post("/leads/upload")
+async def upload_leads(
+    file: UploadFile = File(...),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(get_current_active_user)
+):
+    if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(status_code=400, detail="File must be CSV or Excel format")
+    
+    contents = await file.read()
+    
+    # Replays return before the file is parsed or any lead is inserted; hashing the
+    # bytes (not parsing them) is enough to tell a retry from a different file
+    record_id = idempotency_record_id(idempotency_key, "upload_leads", current_user.id)
+    stored = await begin_idempotent_request(record_id, hashlib.sha256(contents).hexdigest())
+    if stored is not None:
+        # Redone on replay in case it failed after the key was completed
+        await invalidate_snapshots(stored["replay"].get("scopes", []))
+        return stored["response"]
+    
+    completed = False
+    try:
+        # The bulk slot is taken only once the key is ours, so duplicates waiting on
+        # an in-flight upload do not hold slots other uploads and exports need
+        async with bulk_limiter.slot():
+            started = time.perf_counter()
+            docs = parse_lead_rows(file.filename, contents, current_user.id)
+            
+            try:
+                # All rows go in together, so a retry after a failure cannot insert the first ones twice
+                if docs:
+                    await db.leads.insert_many(docs)
+                response = {
+                    "message": f"Successfully uploaded {len(docs)} leads",
+                    "count": len(docs)
+                }
+            except BulkWriteError as e:
+                partial_count = e.details.get('nInserted', 0)
+                if partial_count == 0:
+                    raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+                # Keep the partial result against the key; a retry must not insert these rows again
+                response = {
+                    "message": f"Uploaded {partial_count} of {len(docs)} leads before a database error",
+                    "count": partial_count
+                }
+        
+        # insert_many is ordered, so the inserted rows are the first `count`
+        scopes = [
+            {"district_id": district_id, "status": lead_status}
+            for district_id, lead_status in {(doc.get('district_id'), doc.get('status')) for doc in docs[:response["count"]]}
+        ]
+        # Stored before anything else can fail, so a retry replays it instead of re-inserting
+        await complete_idempotent_request(record_id, response, {"scopes": scopes})
+        completed = True
+    finally:
+        if not completed:
+            await release_idempotency_key(record_id)
+    
+    await invalidate_snapshots(scopes)
+    record_lead_rows("upload", response["count"], started)
+    
+    return response
+
+def parse_lead_rows(filename: str, contents: bytes, created_by: str) -> list:
+    """Validate an uploaded CSV/Excel file and return the lead documents to insert"""
+    import pandas as pd
+    
+    try:
+        # Read file based on type
+        if filename.endswith('.csv'):
+            df = pd.read_csv(io.BytesIO(contents))
+        else:
+            df = pd.read_excel(io.BytesIO(contents))
+        
+        # Validate required columns
+        required_columns = ['name', 'phone']
+        if not all(col in df.columns for col in required_columns):
+            raise HTTPException(
+                status_code=400,
+                detail=f"File must contain columns: {', '.join(required_columns)}"
+            )
+        
+        docs = []
+        for _, row in df.iterrows():
+            lead_data = {
+                "name": str(row['name']),
+                "phone": str(row['phone']),
+                "email": str(row.get('email', '')) if pd.notna(row.get('email')) else None,
+                "company": str(row.get('company', '')) if pd.notna(row.get('company')) else None,
+                "status": str(row.get('status', 'new')),
+                "source": "upload",
+                "notes": str(row.get('notes', '')) if pd.notna(row.get('notes')) else None,
+                "budget": float(row.get('budget', 0)) if pd.notna(row.get('budget')) else None,
+                "created_by": created_by
+            }
+            
+            lead_obj = Lead(**lead_data)
+            doc = lead_obj.model_dump()
+            doc['created_at'] = doc['created_at'].isoformat()
+            doc['updated_at'] = doc['updated_at'].isoformat()
+            if doc.get('expected_close_date'):
+                doc['expected_close_date'] = doc['expected_close_date'].isoformat()
+            docs.append(doc)
+        return docs
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+
+@router.get("/leads/export/excel", dependencies=[Depends(bulk_limiter)])
+async def export_leads(
+    request: Request,
+    status: Optional[str] = None,
+    district_id: Optional[str] = None,
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    # Unscoped exports of the active pipeline are served from pre-built snapshots;
+    # filters outside the known districts x statuses are built live, so arbitrary
+    # query values cannot create snapshot files
+    started = time.perf_counter()
+    if current_user.role != "sales" and not include_archived and await is_snapshot_scope(district_id, status):
+        scope = snapshot_scope(district_id, status)
+        manifest = await fresh_snapshot(scope)
+        if manifest:
+            response = snapshot_response(request, manifest)
+            # 304s and partial ranges do not deliver the rows
+            if response.status_code == 200:
+                record_lead_rows("export", manifest["rows"], started)
+            return response
+        schedule_snapshot_build(scope)
+    
+    query = {}
+    
+    # Sales reps can only export their own leads
+    if current_user.role == "sales":
+        query["assigned_to"] = current_user.id
+    
+    if status:
+        query["status"] = status
+    if district_id:
+        query["district_id"] = district_id
+    
+    leads = await find_leads(query, include_archived, EXPORT_ROW_LIMIT)
+    
+    excel_file = io.BytesIO(render_leads_workbook(leads))
+    
+    record_lead_rows("export", len(leads), started)
+    
+    return StreamingResponse(
+        excel_file,
+        media_type=EXPORT_MEDIA_TYPE,
+        headers={"Content-Disposition": "attachment; filename=leads_export.xlsx"}
+    )
+
+@router.post("/leads/archive", dependencies=[Depends(bulk_limiter)])
+async def archive_leads(
+    older_than_days: int = LEAD_ARCHIVE_AFTER_DAYS,
+    current_user: User = Depends(get_current_active_user)
+):
+    # Only admin can archive leads
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    archived_count = await archive_closed_leads(older_than_days)
+    
+    return {
+        "message": f"Archived {archived_count} closed leads",
+        "count": archived_count
+    }
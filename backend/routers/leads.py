@@ -0,0 +1,216 @@
+from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.encoders import jsonable_encoder
+from typing import List, Optional
+from datetime import datetime, timezone
+import hashlib
+
+from archive import lead_collections
+from database import db
+from export_snapshots import invalidate_snapshots
+from idempotency import (
+    begin_idempotent_request,
+    complete_idempotent_request,
+    idempotency_record_id,
+    release_idempotency_key,
+)
+from models import User, Lead, LeadCreate, LeadUpdate, LeadStatusUpdate
+from security import get_current_active_user
+
+
+router = APIRouter()
+
+
+@router.post("/leads", response_model=Lead)
+async def create_lead(
+    lead_create: LeadCreate,
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
+    current_user: User = Depends(get_current_active_user)
+):
+    record_id = idempotency_record_id(idempotency_key, "create_lead", current_user.id)
+    fingerprint = hashlib.sha256(lead_create.model_dump_json().encode()).hexdigest()
+    stored = await begin_idempotent_request(record_id, fingerprint)
+    if stored is not None:
+        # Redone on replay in case it failed after the key was completed
+        await invalidate_snapshots([stored["response"]])
+        return stored["response"]
+    
+    lead_dict = lead_create.model_dump()
+    lead_obj = Lead(**lead_dict, created_by=current_user.id)
+    
+    doc = lead_obj.model_dump()
+    doc['created_at'] = doc['created_at'].isoformat()
+    doc['updated_at'] = doc['updated_at'].isoformat()
+    if doc.get('expected_close_date'):
+        doc['expected_close_date'] = doc['expected_close_date'].isoformat()
+    
+    completed = False
+    try:
+        await db.leads.insert_one(doc)
+        # Stored before anything else can fail, so a retry replays it instead of re-inserting
+        await complete_idempotent_request(record_id, jsonable_encoder(lead_obj))
+        completed = True
+    finally:
+        if not completed:
+            await release_idempotency_key(record_id)
+    
+    await invalidate_snapshots([doc])
+    return lead_obj
+
+@router.get("/leads", response_model=List[Lead])
+async def get_leads(
+    skip: int = 0,
+    limit: int = 100,
+    status: Optional[str] = None,
+    district_id: Optional[str] = None,
+    assigned_to: Optional[str] = None,
+    source: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    query = {}
+    
+    # Sales reps can only see their own leads
+    if current_user.role == "sales":
+        query["assigned_to"] = current_user.id
+    
+    if status:
+        query["status"] = status
+    if district_id:
+        query["district_id"] = district_id
+    if assigned_to and current_user.role in ["admin", "manager"]:
+        query["assigned_to"] = assigned_to
+    if source:
+        query["source"] = source
+    
+    leads = await db.leads.find(query, {"_id": 0}).skip(skip).limit(limit).to_list(limit)
+    
+    # Convert timestamps
+    for lead in leads:
+        if isinstance(lead.get('created_at'), str):
+            lead['created_at'] = datetime.fromisoformat(lead['created_at'])
+        if isinstance(lead.get('updated_at'), str):
+            lead['updated_at'] = datetime.fromisoformat(lead['updated_at'])
+        if isinstance(lead.get('expected_close_date'), str):
+            lead['expected_close_date'] = datetime.fromisoformat(lead['expected_close_date'])
+    
+    return leads
+
+@router.get("/leads/{lead_id}", response_model=Lead)
+async def get_lead(
+    lead_id: str,
+    include_archived: bool = False,
+    current_user: User = Depends(get_current_active_user)
+):
+    lead = None
+    for collection in lead_collections(include_archived):
+        lead = await collection.find_one({"id": lead_id}, {"_id": 0})
+        if lead:
+            break
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    # Sales reps can only see their own leads
+    if current_user.role == "sales" and lead.get("assigned_to") != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Convert timestamps
+    if isinstance(lead.get('created_at'), str):
+        lead['created_at'] = datetime.fromisoformat(lead['created_at'])
+    if isinstance(lead.get('updated_at'), str):
+        lead['updated_at'] = datetime.fromisoformat(lead['updated_at'])
+    if isinstance(lead.get('expected_close_date'), str):
+        lead['expected_close_date'] = datetime.fromisoformat(lead['expected_close_date'])
+    
+    return Lead(**lead)
+
+@router.put("/leads/{lead_id}", response_model=Lead)
+async def update_lead(
+    lead_id: str,
+    lead_update: LeadUpdate,
+    current_user: User = Depends(get_current_active_user)
+):
+    # Check if lead exists
+    existing_lead = await db.leads.find_one({"id": lead_id})
+    if not existing_lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    # Sales reps can only update their own leads
+    if current_user.role == "sales" and existing_lead.get("assigned_to") != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    update_data = {k: v for k, v in lead_update.model_dump().items() if v is not None}
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    if update_data.get('expected_close_date'):
+        update_data['expected_close_date'] = update_data['expected_close_date'].isoformat()
+    
+    await db.leads.update_one({"id": lead_id}, {"$set": update_data})
+    
+    lead = await db.leads.find_one({"id": lead_id}, {"_id": 0})
+    
+    # Both the scopes the lead left and the ones it moved into
+    await invalidate_snapshots([existing_lead, lead])
+    
+    # Convert timestamps
+    if isinstance(lead.get('created_at'), str):
+        lead['created_at'] = datetime.fromisoformat(lead['created_at'])
+    if isinstance(lead.get('updated_at'), str):
+        lead['updated_at'] = datetime.fromisoformat(lead['updated_at'])
+    if isinstance(lead.get('expected_close_date'), str):
+        lead['expected_close_date'] = datetime.fromisoformat(lead['expected_close_date'])
+    
+    return Lead(**lead)
+
+@router.patch("/leads/{lead_id}/status", response_model=Lead)
+async def update_lead_status(
+    lead_id: str,
+    status_update: LeadStatusUpdate,
+    current_user: User = Depends(get_current_active_user)
+):
+    # Check if lead exists
+    existing_lead = await db.leads.find_one({"id": lead_id})
+    if not existing_lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    # Sales reps can only update their own leads
+    if current_user.role == "sales" and existing_lead.get("assigned_to") != current_user.id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    update_data = {
+        "status": status_update.status,
+        "updated_at": datetime.now(timezone.utc).isoformat()
+    }
+    
+    if status_update.notes:
+        update_data["notes"] = status_update.notes
+    
+    await db.leads.update_one({"id": lead_id}, {"$set": update_data})
+    
+    lead = await db.leads.find_one({"id": lead_id}, {"_id": 0})
+    
+    # Both the scopes the lead left and the ones it moved into
+    await invalidate_snapshots([existing_lead, lead])
+    
+    # Convert timestamps
+    if isinstance(lead.get('created_at'), str):
+        lead['created_at'] = datetime.fromisoformat(lead['created_at'])
+    if isinstance(lead.get('updated_at'), str):
+        lead['updated_at'] = datetime.fromisoformat(lead['updated_at'])
+    if isinstance(lead.get('expected_close_date'), str):
+        lead['expected_close_date'] = datetime.fromisoformat(lead['expected_close_date'])
+    
+    return Lead(**lead)
+
+@router.delete("/leads/{lead_id}")
+async def delete_lead(lead_id: str, current_user: User = Depends(get_current_active_user)):
+    # Only admin and manager can delete leads
+    if current_user.role not in ["admin", "manager"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    lead = await db.leads.find_one_and_delete({"id": lead_id}, {"_id": 0, "district_id": 1, "status": 1})
+    
+    if lead is None:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    await invalidate_snapshots([lead])
+    
+    return {"message": "Lead deleted successfully"}
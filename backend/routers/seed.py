@@ -0,0 +1,36 @@
+from fastapi import APIRouter
+
+from data_generator import generate_dataset
+from database import db
+from security import get_password_hash
+
+
+router = APIRouter()
+
+
+@router.post("/seed-data")
+async def seed_data():
+    """Initialize an empty database with the demo dataset"""
+    
+    # Check if data already exists
+    user_count = await db.users.count_documents({})
+    if user_count > 0:
+        return {"message": "Database already seeded"}
+    
+    # This route needs no login, so it only ever creates the small demo dataset;
+    # larger volumes go through the data_generator.py CLI
+    dataset = await generate_dataset(db, get_password_hash)
+    
+    return {
+        "message": "Database seeded successfully",
+        "counts": {
+            "users": len(dataset["users"]),
+            "districts": len(dataset["districts"]),
+            "leads": dataset["leads"]
+        },
+        "users": {
+            "admin": {"email": "admin@leadmanagement.com", "password": "admin123"},
+            "manager": {"email": "manager@leadmanagement.com", "password": "manager123"},
+            "sales": {"email": "sales@leadmanagement.com", "password": "sales123"}
+        }
+    }
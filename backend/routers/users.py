@@ -0,0 +1,115 @@
+from fastapi import APIRouter, HTTPException, Depends
+from typing import List, Optional
+from datetime import datetime, timezone
+
+from database import db
+from models import User, UserCreate, UserUpdate
+from security import get_password_hash, get_current_active_user
+
+
+router = APIRouter()
+
+
+@router.post("/users", response_model=User)
+async def create_user(user_create: UserCreate, current_user: User = Depends(get_current_active_user)):
+    # Only admin can create users
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Check if user already exists
+    existing_user = await db.users.find_one({"email": user_create.email})
+    if existing_user:
+        raise HTTPException(status_code=400, detail="Email already registered")
+    
+    user_dict = user_create.model_dump()
+    hashed_password = get_password_hash(user_dict.pop("password"))
+    
+    user_obj = User(**user_dict)
+    doc = user_obj.model_dump()
+    doc['hashed_password'] = hashed_password
+    doc['created_at'] = doc['created_at'].isoformat()
+    doc['updated_at'] = doc['updated_at'].isoformat()
+    
+    await db.users.insert_one(doc)
+    return user_obj
+
+@router.get("/users", response_model=List[User])
+async def get_users(
+    skip: int = 0,
+    limit: int = 100,
+    role: Optional[str] = None,
+    current_user: User = Depends(get_current_active_user)
+):
+    query = {}
+    if role:
+        query["role"] = role
+    
+    users = await db.users.find(query, {"_id": 0, "hashed_password": 0}).skip(skip).limit(limit).to_list(limit)
+    
+    # Convert timestamps
+    for user in users:
+        if isinstance(user.get('created_at'), str):
+            user['created_at'] = datetime.fromisoformat(user['created_at'])
+        if isinstance(user.get('updated_at'), str):
+            user['updated_at'] = datetime.fromisoformat(user['updated_at'])
+    
+    return users
+
+@router.get("/users/{user_id}", response_model=User)
+async def get_user(user_id: str, current_user: User = Depends(get_current_active_user)):
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "hashed_password": 0})
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Convert timestamps
+    if isinstance(user.get('created_at'), str):
+        user['created_at'] = datetime.fromisoformat(user['created_at'])
+    if isinstance(user.get('updated_at'), str):
+        user['updated_at'] = datetime.fromisoformat(user['updated_at'])
+    
+    return User(**user)
+
+@router.put("/users/{user_id}", response_model=User)
+async def update_user(
+    user_id: str,
+    user_update: UserUpdate,
+    current_user: User = Depends(get_current_active_user)
+):
+    # Only admin or self can update
+    if current_user.role != "admin" and current_user.id != user_id:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    update_data = {k: v for k, v in user_update.model_dump().items() if v is not None}
+    
+    if "password" in update_data:
+        update_data["hashed_password"] = get_password_hash(update_data.pop("password"))
+    
+    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    
+    result = await db.users.update_one({"id": user_id}, {"$set": update_data})
+    
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    user = await db.users.find_one({"id": user_id}, {"_id": 0, "hashed_password": 0})
+    
+    # Convert timestamps
+    if isinstance(user.get('created_at'), str):
+        user['created_at'] = datetime.fromisoformat(user['created_at'])
+    if isinstance(user.get('updated_at'), str):
+        user['updated_at'] = datetime.fromisoformat(user['updated_at'])
+    
+    return User(**user)
+
+@router.delete("/users/{user_id}")
+async def delete_user(user_id: str, current_user: User = Depends(get_current_active_user)):
+    # Only admin can delete users
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    result = await db.users.delete_one({"id": user_id})
+    
+    if result.deleted_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {"message": "User deleted successfully"}
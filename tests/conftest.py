@@ -0,0 +1,46 @@
+"""Shared fixtures: the backend runs in-process against mongomock-motor"""
+from pathlib import Path
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Read at import time by the backend modules
+os.environ["EXPORT_SNAPSHOT_INTERVAL_SECONDS"] = "0"
+os.environ["LEAD_ARCHIVE_INTERVAL_MINUTES"] = "0"
+
+from mongomock_motor import AsyncMongoMockClient
+import motor.motor_asyncio
+
+motor.motor_asyncio.AsyncIOMotorClient = lambda *args, **kwargs: AsyncMongoMockClient()
+
+import export_snapshots
+import server
+from security import create_access_token
+from tests.helpers import run
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(export_snapshots, "EXPORT_SNAPSHOT_DIR", tmp_path / "export_snapshots")
+    for name in run(server.db.list_collection_names()):
+        run(server.db.drop_collection(name))
+    return server.db
+
+
+@pytest.fixture
+def admin_headers(db):
+    run(db.users.insert_one({
+        "id": "admin-1",
+        "email": "admin@leadmanagement.com",
+        "full_name": "Admin User",
+        "role": "admin",
+        "is_active": True,
+        "hashed_password": "unused",
+        "created_at": "2024-01-01T00:00:00+00:00",
+        "updated_at": "2024-01-01T00:00:00+00:00",
+    }))
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': 'admin-1'})}"}
@@ -0,0 +1,16 @@
+"""Helpers for driving the backend from synchronous tests (conftest.py sets up the app)"""
+import asyncio
+
+import httpx
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def request(method: str, url: str, **kwargs):
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+        return await http.request(method, url, **kwargs)
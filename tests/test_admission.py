@@ -0,0 +1,111 @@
+from fastapi import HTTPException
+import asyncio
+import contextlib
+import pytest
+
+from admission import ConcurrencyLimiter, bulk_limiter
+from tests.helpers import request, run
+
+
+def make_limiter(**overrides) -> ConcurrencyLimiter:
+    options = {"limit": 1, "max_waiting": 0, "max_wait_seconds": 0, "retry_after_seconds": 7}
+    options.update(overrides)
+    return ConcurrencyLimiter("test", **options)
+
+
+def test_saturated_limiter_rejects_with_retry_after():
+    limiter = make_limiter()
+
+    async def scenario():
+        holder = limiter()
+        await holder.__anext__()
+        try:
+            await limiter().__anext__()
+        finally:
+            await holder.aclose()
+
+    with pytest.raises(HTTPException) as error:
+        run(scenario())
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "7"}
+
+
+def test_slot_is_released_after_request():
+    limiter = make_limiter()
+
+    async def scenario():
+        first = limiter()
+        await first.__anext__()
+        assert limiter.in_flight == 1
+        await first.aclose()
+
+        second = limiter()
+        await second.__anext__()
+        await second.aclose()
+
+    run(scenario())
+    assert limiter.in_flight == 0
+    assert not limiter._semaphore.locked()
+
+
+def test_slot_is_released_when_request_fails():
+    limiter = make_limiter()
+
+    async def scenario():
+        holder = limiter()
+        await holder.__anext__()
+        with pytest.raises(RuntimeError):
+            await holder.athrow(RuntimeError("handler failed"))
+
+    run(scenario())
+    assert limiter.snapshot() == {"limit": 1, "in_flight": 0, "waiting": 0}
+
+
+def test_queued_request_gets_freed_slot():
+    limiter = make_limiter(max_waiting=1, max_wait_seconds=1)
+
+    async def scenario():
+        holder = limiter()
+        await holder.__anext__()
+        waiter = asyncio.ensure_future(limiter().__anext__())
+        await asyncio.sleep(0)
+        assert limiter.waiting == 1
+        await holder.aclose()
+        await waiter
+        assert limiter.in_flight == 1
+
+    run(scenario())
+
+
+@contextlib.asynccontextmanager
+async def saturated(limiter: ConcurrencyLimiter):
+    async with contextlib.AsyncExitStack() as stack:
+        for _ in range(limiter.limit):
+            await stack.enter_async_context(limiter.slot())
+        yield
+
+
+def test_upload_replay_does_not_need_a_bulk_slot(db, admin_headers):
+    headers = {**admin_headers, "Idempotency-Key": "upload-1"}
+    files = {"file": ("leads.csv", b"name,phone\nAlpha,111\n", "text/csv")}
+    first = run(request("POST", "/api/leads/upload", headers=headers, files=files))
+    assert first.status_code == 200
+
+    async def replay_while_saturated():
+        async with saturated(bulk_limiter):
+            return await request("POST", "/api/leads/upload", headers=headers, files=files)
+
+    replay = run(replay_while_saturated())
+    assert replay.status_code == 200
+    assert replay.json() == first.json()
+    assert run(db.leads.count_documents({})) == 1
+
+
+def test_export_is_rejected_when_bulk_slots_are_full(db, admin_headers):
+    async def export_while_saturated():
+        async with saturated(bulk_limiter):
+            return await request("GET", "/api/leads/export/excel", headers=admin_headers)
+
+    response = run(export_while_saturated())
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == str(bulk_limiter.retry_after_seconds)
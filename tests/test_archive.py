@@ -0,0 +1,97 @@
+from datetime import datetime, timedelta, timezone
+import io
+
+from archive import archive_closed_leads, find_leads
+from tests.helpers import request, run
+
+
+def days_ago(days: int) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def lead(lead_id: str, status: str, age_days: int, **fields) -> dict:
+    doc = {
+        "id": lead_id,
+        "name": f"Lead {lead_id}",
+        "phone": "+911234567890",
+        "status": status,
+        "source": "manual",
+        "district_id": "district-1",
+        "budget": 1000.0,
+        "created_at": days_ago(age_days),
+        "updated_at": days_ago(age_days),
+    }
+    doc.update(fields)
+    return doc
+
+
+def export_names(headers: dict, **params) -> list:
+    from openpyxl import load_workbook
+
+    response = run(request("GET", "/api/leads/export/excel", headers=headers, params=params))
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.content)).active
+    return [row[0] for row in sheet.iter_rows(min_row=2, values_only=True)]
+
+
+def ids(leads: list) -> set:
+    return {lead["id"] for lead in leads}
+
+
+def test_archives_only_old_closed_leads(db):
+    run(db.leads.insert_many([
+        lead("old-won", "won", 400),
+        lead("old-lost", "lost", 400),
+        lead("old-open", "negotiation", 400),
+        lead("recent-won", "won", 10),
+    ]))
+
+    assert run(archive_closed_leads(older_than_days=180)) == 2
+    assert ids(run(db.leads.find({}).to_list(None))) == {"old-open", "recent-won"}
+    archived = run(db.leads_archive.find({}).to_list(None))
+    assert ids(archived) == {"old-won", "old-lost"}
+    assert all(doc.get("archived_at") for doc in archived)
+
+
+def test_rerun_overwrites_copy_left_by_interrupted_run(db):
+    run(db.leads.insert_one(lead("old-won", "won", 400, notes="current")))
+    run(db.leads_archive.insert_one(lead("old-won", "won", 400, notes="stale")))
+
+    assert run(archive_closed_leads(older_than_days=180)) == 1
+    assert run(db.leads.count_documents({})) == 0
+    assert run(db.leads_archive.find_one({"id": "old-won"}))["notes"] == "current"
+
+
+def test_archived_leads_hidden_unless_requested(db, admin_headers):
+    run(db.leads.insert_one(lead("hot", "new", 1)))
+    run(db.leads_archive.insert_one(lead("cold", "won", 400)))
+
+    assert run(request("GET", "/api/leads/cold", headers=admin_headers)).status_code == 404
+    response = run(request("GET", "/api/leads/cold", headers=admin_headers, params={"include_archived": "true"}))
+    assert response.status_code == 200
+    assert response.json()["id"] == "cold"
+
+    stats = run(request("GET", "/api/dashboard/stats", headers=admin_headers)).json()
+    assert stats["total_leads"] == 1
+    stats = run(request("GET", "/api/dashboard/stats", headers=admin_headers,
+                        params={"include_archived": "true"})).json()
+    assert stats["total_leads"] == 2
+
+    assert export_names(admin_headers) == ["Lead hot"]
+    assert export_names(admin_headers, include_archived="true") == ["Lead hot", "Lead cold"]
+
+
+def test_lead_in_both_collections_counted_once(db, admin_headers):
+    # An archiving run interrupted between the archive write and the hot delete
+    run(db.leads.insert_one(lead("both", "won", 400)))
+    run(db.leads_archive.insert_one(lead("both", "won", 400, archived_at=days_ago(0))))
+    run(db.leads_archive.insert_one(lead("cold", "won", 400)))
+
+    leads = run(find_leads({}, include_archived=True))
+    assert sorted(lead["id"] for lead in leads) == ["both", "cold"]
+    # The hot copy wins
+    assert "archived_at" not in next(lead for lead in leads if lead["id"] == "both")
+
+    regions = run(request("GET", "/api/dashboard/regions", headers=admin_headers,
+                          params={"include_archived": "true"})).json()
+    assert sum(region["total_leads"] for region in regions) == 2
@@ -0,0 +1,136 @@
+import asyncio
+import pytest
+
+import export_snapshots
+from export_snapshots import RANGE_PATTERN, build_snapshot, fresh_snapshot, parse_range, snapshot_scope
+from tests.helpers import request, run
+
+
+EXPORT_URL = "/api/leads/export/excel"
+SCOPE = snapshot_scope(None, None)
+
+
+def byte_range(header: str, size: int = 100):
+    return parse_range(RANGE_PATTERN.fullmatch(header), size)
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=-10", (90, 99)),
+    # Suffix longer than the file is the whole file
+    ("bytes=-500", (0, 99)),
+    # Last byte past the end is clamped
+    ("bytes=50-1000", (50, 99)),
+])
+def test_parse_range(header, expected):
+    assert byte_range(header) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=100-200", "bytes=20-10", "bytes=-0", "bytes=-"])
+def test_parse_range_unsatisfiable(header):
+    assert byte_range(header) is None
+
+
+@pytest.fixture
+def snapshot(db, admin_headers):
+    run(db.leads.insert_one({"id": "lead-1", "name": "Acme", "phone": "1", "status": "new", "district_id": None}))
+    return run(build_snapshot(SCOPE))
+
+
+def test_snapshot_served_with_etag_and_304(snapshot, admin_headers):
+    response = run(request("GET", EXPORT_URL, headers=admin_headers))
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{snapshot["sha256"]}"'
+    assert len(response.content) == snapshot["size"]
+
+    headers = {**admin_headers, "If-None-Match": response.headers["etag"]}
+    assert run(request("GET", EXPORT_URL, headers=headers)).status_code == 304
+
+
+def test_range_requests(snapshot, admin_headers):
+    size = snapshot["size"]
+    etag = f'"{snapshot["sha256"]}"'
+
+    response = run(request("GET", EXPORT_URL, headers={**admin_headers, "Range": "bytes=-10"}))
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes {size - 10}-{size - 1}/{size}"
+    assert len(response.content) == 10
+
+    response = run(request("GET", EXPORT_URL, headers={**admin_headers, "Range": f"bytes={size}-"}))
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+    # If-Range only honours the range while the ETag still matches
+    headers = {**admin_headers, "Range": "bytes=0-9", "If-Range": etag}
+    assert run(request("GET", EXPORT_URL, headers=headers)).status_code == 206
+    headers["If-Range"] = '"stale"'
+    response = run(request("GET", EXPORT_URL, headers=headers))
+    assert response.status_code == 200
+    assert len(response.content) == size
+
+
+def test_lead_write_makes_snapshot_stale(snapshot, admin_headers):
+    assert run(fresh_snapshot(SCOPE)) is not None
+
+    lead = {"name": "New Lead", "phone": "2"}
+    assert run(request("POST", "/api/leads", headers=admin_headers, json=lead)).status_code == 200
+    assert run(fresh_snapshot(SCOPE)) is None
+
+    # Served live (no ETag) until the snapshot is rebuilt
+    response = run(request("GET", EXPORT_URL, headers=admin_headers))
+    assert response.status_code == 200
+    assert "etag" not in response.headers
+
+
+def test_unknown_scope_is_not_snapshotted(db, admin_headers):
+    response = run(request("GET", EXPORT_URL, headers=admin_headers, params={"district_id": "no-such-district"}))
+    assert response.status_code == 200
+    assert not export_snapshots.EXPORT_SNAPSHOT_DIR.exists()
+
+
+def test_manifests_of_removed_scopes_are_pruned(db):
+    run(db.districts.insert_one({"id": "district-1", "name": "Pune", "state": "Maharashtra", "region": "West"}))
+    district_scope = snapshot_scope("district-1", None)
+    run(build_snapshot(district_scope))
+    assert export_snapshots.read_manifest(district_scope) is not None
+
+    run(db.districts.delete_one({"id": "district-1"}))
+    run(export_snapshots.refresh_stale_snapshots())
+    assert export_snapshots.read_manifest(district_scope) is None
+    assert export_snapshots.read_manifest(SCOPE) is not None
+
+
+def test_rebuilding_unchanged_rows_keeps_file_and_etag(db):
+    run(db.leads.insert_one({"id": "lead-1", "name": "Acme", "phone": "1", "status": "new"}))
+    manifests = [run(build_snapshot(SCOPE)) for _ in range(3)]
+
+    assert len({manifest["sha256"] for manifest in manifests}) == 1
+    assert len(list(export_snapshots.EXPORT_SNAPSHOT_DIR.glob("*.xlsx"))) == 1
+
+
+def test_export_miss_build_prunes_superseded_files(db, admin_headers, monkeypatch):
+    monkeypatch.setattr(export_snapshots, "EXPORT_SNAPSHOT_RETAIN_SECONDS", -1)
+    run(db.leads.insert_one({"id": "lead-1", "name": "Acme", "phone": "1", "status": "new"}))
+    run(build_snapshot(SCOPE))
+
+    async def export_after_write(name: str):
+        await request("POST", "/api/leads", headers=admin_headers, json={"name": name, "phone": "2"})
+        await request("GET", EXPORT_URL, headers=admin_headers)
+        # Let the scheduled build finish before the loop closes
+        await asyncio.gather(*export_snapshots.build_tasks)
+
+    run(export_after_write("Second"))
+    run(export_after_write("Third"))
+    assert len(list(export_snapshots.EXPORT_SNAPSHOT_DIR.glob("*.xlsx"))) == 1
+
+
+def test_snapshot_served_exports_count_rows(snapshot, admin_headers):
+    from prometheus_client import REGISTRY
+
+    def exported_rows():
+        return REGISTRY.get_sample_value("lead_rows_total", {"operation": "export"}) or 0
+
+    before = exported_rows()
+    assert run(request("GET", EXPORT_URL, headers=admin_headers)).status_code == 200
+    assert exported_rows() == before + snapshot["rows"]
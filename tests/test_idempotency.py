@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException
+import pytest
+
+import routers.lead_files
+import routers.leads
+from export_snapshots import build_snapshot, fresh_snapshot, snapshot_scope
+from idempotency import (
+    begin_idempotent_request,
+    complete_idempotent_request,
+    idempotency_record_id,
+    release_idempotency_key,
+)
+from tests.helpers import request, run
+
+
+LEAD = {"name": "Acme Lead", "phone": "+911234567890"}
+ALL_LEADS = snapshot_scope(None, None)
+
+
+def test_no_key_is_not_tracked(db):
+    assert idempotency_record_id(None, "create_lead", "user-1") is None
+    assert run(begin_idempotent_request(None, "fingerprint")) is None
+    assert run(db.idempotency_keys.count_documents({})) == 0
+
+
+def test_completed_key_replays_stored_response(db):
+    async def scenario():
+        assert await begin_idempotent_request("k1", "fp") is None
+        await complete_idempotent_request("k1", {"id": "lead-1"})
+        return await begin_idempotent_request("k1", "fp")
+
+    assert run(scenario())["response"] == {"id": "lead-1"}
+
+
+def test_different_payload_under_same_key_is_rejected(db):
+    async def scenario():
+        await begin_idempotent_request("k1", "fp")
+        await complete_idempotent_request("k1", {"id": "lead-1"})
+        await begin_idempotent_request("k1", "other-fp")
+
+    with pytest.raises(HTTPException) as error:
+        run(scenario())
+    assert error.value.status_code == 422
+
+
+def test_released_key_can_be_claimed_again(db):
+    async def scenario():
+        await begin_idempotent_request("k1", "fp")
+        await release_idempotency_key("k1")
+        return await begin_idempotent_request("k1", "fp")
+
+    assert run(scenario()) is None
+    assert run(db.idempotency_keys.find_one({"_id": "k1"}))["state"] == "in_progress"
+
+
+def test_in_flight_duplicate_times_out_with_409(db):
+    async def scenario():
+        await begin_idempotent_request("k1", "fp")
+        await begin_idempotent_request("k1", "fp", wait_seconds=0)
+
+    with pytest.raises(HTTPException) as error:
+        run(scenario())
+    assert error.value.status_code == 409
+    assert "Retry-After" in error.value.headers
+
+
+def test_expired_claim_is_taken_over(db):
+    expired = datetime.now(timezone.utc) - timedelta(seconds=1)
+    run(db.idempotency_keys.insert_one({
+        "_id": "k1", "fingerprint": "fp", "state": "in_progress",
+        "locked_until": expired, "created_at": expired
+    }))
+
+    # The owner died mid-request; a retry claims the key instead of waiting for the TTL
+    assert run(begin_idempotent_request("k1", "fp", wait_seconds=0)) is None
+    record = run(db.idempotency_keys.find_one({"_id": "k1"}))
+    assert record["state"] == "in_progress"
+    assert record["locked_until"].replace(tzinfo=timezone.utc) > datetime.now(timezone.utc)
+
+
+def test_create_lead_replay_redoes_failed_invalidation(db, admin_headers, monkeypatch):
+    headers = {**admin_headers, "Idempotency-Key": "create-1"}
+    run(build_snapshot(ALL_LEADS))
+
+    async def failing_invalidate(leads):
+        raise RuntimeError("snapshot store unavailable")
+
+    with monkeypatch.context() as patched, pytest.raises(RuntimeError):
+        patched.setattr(routers.leads, "invalidate_snapshots", failing_invalidate)
+        run(request("POST", "/api/leads", headers=headers, json=LEAD))
+    # The lead is in, but the snapshot still looks fresh
+    assert run(fresh_snapshot(ALL_LEADS)) is not None
+
+    response = run(request("POST", "/api/leads", headers=headers, json=LEAD))
+    assert response.status_code == 200
+    assert run(db.leads.count_documents({})) == 1
+    assert run(db.idempotency_keys.find_one({"_id": idempotency_record_id("create-1", "create_lead", "admin-1")}))["state"] == "completed"
+    assert run(fresh_snapshot(ALL_LEADS)) is None
+
+
+def test_upload_replay_redoes_failed_invalidation(db, admin_headers, monkeypatch):
+    headers = {**admin_headers, "Idempotency-Key": "upload-1"}
+    files = {"file": ("leads.csv", b"name,phone,status\nAlpha,111,qualified\n", "text/csv")}
+    scope = snapshot_scope(None, "qualified")
+    run(build_snapshot(scope))
+
+    async def failing_invalidate(leads):
+        raise RuntimeError("snapshot store unavailable")
+
+    with monkeypatch.context() as patched, pytest.raises(RuntimeError):
+        patched.setattr(routers.lead_files, "invalidate_snapshots", failing_invalidate)
+        run(request("POST", "/api/leads/upload", headers=headers, files=files))
+    assert run(fresh_snapshot(scope)) is not None
+
+    assert run(request("POST", "/api/leads/upload", headers=headers, files=files)).status_code == 200
+    assert run(db.leads.count_documents({})) == 1
+    assert run(fresh_snapshot(scope)) is None
+
+
+def test_create_lead_releases_key_when_insert_fails(db, admin_headers, monkeypatch):
+    headers = {**admin_headers, "Idempotency-Key": "create-1"}
+
+    async def failing_insert(collection, doc):
+        raise RuntimeError("insert failed")
+
+    with monkeypatch.context() as patched, pytest.raises(RuntimeError):
+        patched.setattr(type(db.leads), "insert_one", failing_insert)
+        run(request("POST", "/api/leads", headers=headers, json=LEAD))
+
+    assert run(db.idempotency_keys.count_documents({})) == 0
+    assert run(request("POST", "/api/leads", headers=headers, json=LEAD)).status_code == 200
+    assert run(db.leads.count_documents({})) == 1
+
+
+def test_upload_fingerprints_file_contents(db, admin_headers):
+    headers = {**admin_headers, "Idempotency-Key": "upload-1"}
+
+    def upload(body: bytes):
+        files = {"file": ("leads.csv", body, "text/csv")}
+        return run(request("POST", "/api/leads/upload", headers=headers, files=files))
+
+    first = upload(b"name,phone\nAlpha,111\n")
+    assert first.status_code == 200
+    assert upload(b"name,phone\nAlpha,111\n").json() == first.json()
+    # Same name and size, different rows
+    assert upload(b"name,phone\nBravo,222\n").status_code == 422
+    assert run(db.leads.count_documents({})) == 1
+
+
+def test_invalid_upload_releases_key(db, admin_headers):
+    headers = {**admin_headers, "Idempotency-Key": "upload-1"}
+    files = {"file": ("leads.csv", b"name\nAlpha\n", "text/csv")}
+
+    response = run(request("POST", "/api/leads/upload", headers=headers, files=files))
+    assert response.status_code == 400
+    assert run(db.idempotency_keys.count_documents({})) == 0